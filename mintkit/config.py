@@ -20,6 +20,7 @@ paths.user = paths.appdata + paths.home[-1]
 paths.settings = paths.user + 'settings'
 paths.creds = paths.user + 'creds'
 paths.plots = paths.user + 'plots'
+paths.store = paths.user + 'store'
 paths.x86 = mintkit.utils.paths.Path(r"C:\Program Files (x86)")
 paths.chrome = paths.x86 + r'Google\Chrome\Application\chrome.exe'
 paths.chrome_profile = paths.local + r'Google\Chrome\User Data\Default'
@@ -1,10 +1,20 @@
 import mintkit.config as cfg
 import mintkit.utils.logging
 import mintkit.core.tasks
-from mintkit.utils.formatting import usd
+import mintkit.core.rules
+import mintkit.core.store
+import mintkit.core.snapshot
+import mintkit.core.prefix
+import mintkit.core.merchants
+import mintkit.core.search
+import mintkit.core.template
+from mintkit.utils.formatting import usd, to_cents
 import pandas as pd
 import numpy as np
+import concurrent.futures
 import datetime
+import hashlib
+import pickle
 import re
 import os
 
@@ -19,6 +29,38 @@ INCOME = ['Income', 'Bonus', 'Interest Income', 'Paycheck', 'Reimbursement',
 WASH = ['Credit Card Payment', 'Transfer']
 # Transaction groups
 GROUPS = ['Income', 'Rent', 'Recurring', 'Investments', 'Discretionary']
+# Category watchlists by name
+WATCHLISTS = {'Auto': ['Parking', 'Auto Insurance', 'Auto & Transport']}
+
+# Date format of Mint's transaction exports
+DATE_FORMAT = '%m/%d/%Y'
+
+# Column types of Mint's transaction exports
+TRANSACTION_DTYPES = {'Date': str,
+                      'Description': str,
+                      'Original Description': str,
+                      'Amount': np.float64,
+                      'Transaction Type': str,
+                      'Category': str,
+                      'Account Name': str,
+                      'Labels': str,
+                      'Notes': str}
+# Columns identifying the same transaction across overlapping exports
+NATURAL_KEY = ['Date', 'Description', 'Amount', 'Account Name']
+# Default number of rows per chunk when streaming an export
+CHUNKSIZE = 100000
+
+# Columns of repeated labels stored as categoricals in compact mode
+CATEGORICAL_COLUMNS = ['Category', 'Account Name', 'Transaction Type',
+                       'Group', 'Subgroup']
+# Free text columns stored with a compact string dtype in compact mode
+TEXT_COLUMNS = ['Description', 'Original Description', 'Labels', 'Notes']
+
+# Rolling window lengths (days) of the rolling spending stats
+ROLLING_WINDOWS = [7, 30, 90]
+
+# Classification cache
+CLASSIFICATION_CACHE_PATH = cfg.paths.user + 'classification.cache'
 
 # Regular Expressions
 TRANSACT_PATTERN = r'transactions(?: \((?P<instance>\d+)\))?\.csv'
@@ -48,6 +90,49 @@ def get_latest_file_location():
     return cfg.paths.downloads + trans_file
 
 
+def get_all_file_locations():
+    """Return a list of the locations of every downloaded transactions
+    file, most recent first.
+
+    """
+    dl_files = os.listdir(cfg.paths.downloads)
+    trans_files = [x for x in dl_files if TRANSACT_RE.match(x)]
+    trans_files.sort(key=_sort_files, reverse=True)
+    return [cfg.paths.downloads + x for x in trans_files]
+
+
+def read_keyed_transactions(file_path):
+    """Return a raw Mint export along with a Key column fingerprinting
+    each row's natural key and its occurrence count within the file.
+
+    """
+    transactions = pd.read_csv(file_path, dtype=TRANSACTION_DTYPES)
+    transactions['Key'] = mintkit.core.store.get_row_fingerprints(
+        transactions, NATURAL_KEY)
+    return transactions
+
+
+def get_merged_transactions(file_paths=None, max_workers=None):
+    """Return a single raw DataFrame merging every downloaded transactions
+    file (or the given files), which are parsed in parallel.
+    Rows are deduplicated through a hash index on the natural key and its
+    occurrence count, so overlapping exports are combined without losing
+    repeated identical transactions.
+
+    """
+    if file_paths is None:
+        file_paths = get_all_file_locations()
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        frames = list(executor.map(read_keyed_transactions, file_paths))
+    transactions = pd.concat(frames, ignore_index=True, sort=False)
+    transactions = transactions[~transactions['Key'].duplicated().values]
+    transactions = transactions.drop('Key', axis=1)
+    transactions = transactions.reset_index(drop=True)
+    log.info(f'Merged {len(file_paths)} exports into '
+             f'{len(transactions)} transactions.')
+    return transactions
+
+
 def delete_all_transaction_files():
     """Delete all transactions files in the Downloads folder.
 
@@ -71,7 +156,7 @@ def get_next_month_start(month, year):
     if next_month == 13:
         next_month = 1
         next_year = year + 1
-    next_month_start = datetime.date(next_year, next_month, 1)
+    next_month_start = pd.Timestamp(next_year, next_month, 1)
     return next_month_start
 
 
@@ -79,7 +164,7 @@ def get_days_in_month(month, year):
     """Return the days in the given month.
 
     """
-    curr_month_start = datetime.date(year, month, 1)
+    curr_month_start = pd.Timestamp(year, month, 1)
     next_start_of_month = get_next_month_start(month, year)
     tdelta = next_start_of_month - curr_month_start
     return tdelta.days
@@ -90,114 +175,451 @@ def get_recurring(template_path=None):
     the template file.
 
     """
-    if template_path is None:
-        template_path = cfg.paths.template
-    recurring = pd.read_excel(str(template_path),
-                              sheet_name='Recurring',
-                              skiprows=2)
-    recurring = recurring.dropna(subset=['Pattern'])
+    sheets = mintkit.core.template.get_template_sheets(template_path)
+    recurring = sheets['Recurring'].dropna(subset=['Pattern'])
     return recurring
 
 
-def match_recurring(x, recurring):
-    """Return the subgroup of recurring transactions only.
-    Otherwise return None.
-
-    """
-    for _, (subgroup, column, pattern, _, _) in recurring.iterrows():
-        if re.match(pattern, x[column]):
-            return subgroup
-    return None
-
-
 def get_investments(template_path=None):
     """Return a dataframe of investment transactions as outlined in
     the template file.
 
     """
-    if template_path is None:
-        template_path = cfg.paths.template
-    investments = pd.read_excel(str(template_path),
-                                sheet_name='Investments',
-                                skiprows=2)
-    investments = investments.dropna(subset=['Pattern'])
+    sheets = mintkit.core.template.get_template_sheets(template_path)
+    investments = sheets['Investments'].dropna(subset=['Pattern'])
     return investments
 
 
-def match_investments(x, investments):
-    """Return the subgroup of investment transactions only.
-    Otherwise return None.
+def classify_transactions(transactions, recurring, investments):
+    """Return a DataFrame with the Group and Subgroup of every transaction.
+    Transaction groups can be either rent, income, investments, wash,
+    recurring, or discretionary spending, checked in that order with the
+    first matching check deciding the group.
+    Each check is evaluated as a mask over the whole frame and the template
+    rules are only matched against rows not already decided by an earlier
+    check.
+    Note that you cannot manually set a category to "Investments" in Mint
+    and that only post-tax contributions should be defined as investments.
+    This function may fail if the number of income or wash categories are
+    expanded by Mint in the future.
 
     """
-    for _, (subgroup, column, pattern, _, _) in investments.iterrows():
-        if re.match(pattern, x[column]):
-            return subgroup
-    return None
+    category = transactions['Category']
+    day = transactions['Date'].dt.day.values
+    is_rent = (category == 'Mortgage & Rent').values
+    is_income = category.isin(INCOME).values
+    is_paycheck = (category == 'Paycheck').values
+    decided = is_rent | is_income
+    # Check if investment
+    invest_rules = mintkit.core.rules.RuleSet(investments)
+    invest_idx = np.full(len(transactions), mintkit.core.rules.NO_MATCH)
+    invest_idx[~decided] = invest_rules.match(transactions[~decided])
+    is_invest = invest_idx != mintkit.core.rules.NO_MATCH
+    is_unid_invest = (category == 'Investments').values
+    is_wash = category.isin(WASH).values
+    decided |= is_invest | is_unid_invest | is_wash
+    # Check if recurring
+    recur_rules = mintkit.core.rules.RuleSet(recurring)
+    recur_idx = np.full(len(transactions), mintkit.core.rules.NO_MATCH)
+    recur_idx[~decided] = recur_rules.match(transactions[~decided])
+    is_recur = recur_idx != mintkit.core.rules.NO_MATCH
+    category = category.values.astype(object)
+    conditions = [is_rent,
+                  is_income & ~is_paycheck,
+                  is_paycheck & (day <= 20),
+                  is_paycheck & (day > 20),
+                  is_invest,
+                  is_unid_invest,
+                  is_wash,
+                  is_recur]
+    groups = ['Rent', 'Income', 'Income', 'Income', 'Investments',
+              'Investments', 'Wash', 'Recurring']
+    subgroups = [category,
+                 category,
+                 'Middle-of-Month',
+                 'End-of-Month',
+                 invest_rules.get_subgroups(invest_idx),
+                 'Investments',
+                 category,
+                 recur_rules.get_subgroups(recur_idx)]
+    group = np.select(conditions,
+                      [np.full(len(transactions), x, dtype=object)
+                       for x in groups],
+                      'Discretionary')
+    subgroup = np.select(conditions,
+                         [np.broadcast_to(np.asarray(x, dtype=object),
+                                          len(transactions))
+                          for x in subgroups],
+                         'Discretionary')
+    return pd.DataFrame({'Group': group, 'Subgroup': subgroup},
+                        index=transactions.index)
+
+
+def get_classification_hash(recurring, investments):
+    """Return a hash of the parsed Recurring and Investments rules (and
+    the income and wash categories) that determine transaction groups.
 
+    """
+    hasher = hashlib.sha256()
+    for rules in (recurring, investments):
+        rules_csv = rules[['Subgroup', 'Column', 'Pattern']].to_csv(
+            index=False)
+        hasher.update(rules_csv.encode('utf-8'))
+    hasher.update(repr((INCOME, WASH)).encode('utf-8'))
+    return hasher.hexdigest()
 
-def apply_transaction_groups(x, recurring, investments):
-    """Return a transactions group and subgroup.
-    Transaction groups can be either income, rent, recurring, or
-    discretionary spending.
-    This function may fail if the number of income or wash
-    categories are expanded by Mint in the future.
+
+def get_classification_key(transactions, recurring, investments):
+    """Return a DataFrame holding every value that can affect the
+    classification of a transaction: its category, the columns used by the
+    template rules and whether it falls after the 20th (paycheck split).
 
     """
-    # Check if rent
-    if x['Category'] == 'Mortgage & Rent':
-        return 'Rent', x['Category']
-    # Check if income
-    if x['Category'] in INCOME:
-        if x['Category'] != 'Paycheck':
-            return 'Income', x['Category']
-        if x['Date'].day <= 20:
-            return 'Income', 'Middle-of-Month'
-        if x['Date'].day > 20:
-            return 'Income', 'End-of-Month'
-    # Check if investment
-    # Note that you cannot manually set a category to "Investments" in Mint
-    # Note that only post-tax contributions should be defined as investments
-    invest_subgroup = match_investments(x, investments)
-    if invest_subgroup:
-        return 'Investments', invest_subgroup
-    # Check if unidentified investment
-    if x['Category'] == 'Investments':
-        return 'Investments', 'Investments'
-    # Check if wash
-    if x['Category'] in WASH:
-        return 'Wash', x['Category']
-    # Check if recurring
-    recur_subgroup = match_recurring(x, recurring)
-    if recur_subgroup:
-        return 'Recurring', recur_subgroup
-    # Otherwise, must be discretionary
-    return 'Discretionary', 'Discretionary'
+    rule_columns = set(recurring['Column']) | set(investments['Column'])
+    key_columns = ['Category'] + sorted(rule_columns - {'Category'})
+    key = transactions[key_columns].copy()
+    key['Late Month'] = transactions['Date'].dt.day > 20
+    return key
 
 
-def get_transactions(file_path=None, refine=True):
-    """Return a dataframe of the most specified Mint transactions file.
-    If refine is set to True, then column types and values will be
-    adjusted and the new Group and Subgroup columns will be added.
+def load_classification_cache(classification_hash):
+    """Return the cached classifications saved in the user's directory.
+    The cache is discarded if it was built with different template rules.
+
+    """
+    if not os.path.isfile(CLASSIFICATION_CACHE_PATH):
+        return None
+    try:
+        with open(CLASSIFICATION_CACHE_PATH, 'rb') as file:
+            saved_hash, cache = pickle.load(file)
+    except Exception as e:
+        log.info(f'Classification cache could not be loaded: {e}')
+        return None
+    if saved_hash != classification_hash:
+        log.info('Template rules changed, discarding classification cache.')
+        return None
+    return cache
+
+
+def save_classification_cache(classification_hash, cache):
+    """Save the cached classifications to the user's directory.
+
+    """
+    with open(CLASSIFICATION_CACHE_PATH, 'wb') as file:
+        pickle.dump((classification_hash, cache), file)
+
+
+def load_classification_state(recurring, investments):
+    """Return a dictionary holding the classification hash of the rules,
+    the classifications cached on disk for them (see
+    load_classification_cache), a hash index of their keys (built on first
+    use) and whether they changed since loaded.
+
+    """
+    classification_hash = get_classification_hash(recurring, investments)
+    return {'hash': classification_hash,
+            'cache': load_classification_cache(classification_hash),
+            'lookup': None,
+            'changed': False}
+
+
+def get_key_hashes(key):
+    """Return a uint64 hash of every row of a classification key.
+
+    """
+    return pd.util.hash_pandas_object(key, index=False).values
+
+
+def classify_transactions_cached(transactions, recurring, investments,
+                                 state=None):
+    """Return a DataFrame with the Group and Subgroup of every transaction,
+    reusing classifications memoized on disk for previously seen
+    classification keys and only classifying the rest.
+    Cached keys are looked up through a hash index of the cache.
+    If a classification state is given (see load_classification_state),
+    the cache and its index are read from and added to it in memory and
+    saving the cache is left to the caller, so that many frames share a
+    single load, index and save.
+
+    """
+    is_shared = state is not None
+    if not is_shared:
+        state = load_classification_state(recurring, investments)
+    key = get_classification_key(transactions, recurring, investments)
+    if state['cache'] is None:
+        state['cache'] = key.iloc[:0].assign(Group=None, Subgroup=None)
+    if state['lookup'] is None:
+        state['lookup'] = pd.Index(
+            get_key_hashes(state['cache'][key.columns]))
+    key_hashes = get_key_hashes(key)
+    positions = state['lookup'].get_indexer(key_hashes)
+    missing = positions < 0
+    if missing.any():
+        log.info(f'Classifying {missing.sum()} uncached transactions.')
+        first = ~pd.Series(key_hashes[missing]).duplicated().values
+        new_key = key[missing][first]
+        new_groups = classify_transactions(
+            transactions[missing][first], recurring, investments)
+        new_cache = pd.concat([new_key, new_groups], axis=1)
+        state['cache'] = pd.concat([state['cache'], new_cache],
+                                   ignore_index=True, sort=False)
+        state['lookup'] = state['lookup'].append(
+            pd.Index(key_hashes[missing][first]))
+        state['changed'] = True
+        positions = state['lookup'].get_indexer(key_hashes)
+    if not is_shared and state['changed']:
+        save_classification_cache(state['hash'], state['cache'])
+    groups = state['cache'][['Group', 'Subgroup']].iloc[positions]
+    groups.index = transactions.index
+    return groups
+
+
+def get_rule_diagnostics(transactions=None, recurring=None,
+                         investments=None):
+    """Return a DataFrame of per-rule diagnostics for the Investments and
+    Recurring template sheets (see RuleSet.profile).
+    Each sheet is only profiled against the transactions that reach it in
+    classify_transactions.
+
+    """
+    if transactions is None:
+        transactions = get_transactions()
+    if recurring is None:
+        recurring = get_recurring()
+    if investments is None:
+        investments = get_investments()
+    reach_invest = ~transactions['Group'].isin(['Rent', 'Income'])
+    reach_recur = transactions['Group'].isin(['Recurring', 'Discretionary'])
+    invest_stats = mintkit.core.rules.RuleSet(investments).profile(
+        transactions[reach_invest])
+    recur_stats = mintkit.core.rules.RuleSet(recurring).profile(
+        transactions[reach_recur])
+    invest_stats.insert(0, 'Sheet', 'Investments')
+    recur_stats.insert(0, 'Sheet', 'Recurring')
+    diagnostics = pd.concat([invest_stats, recur_stats])
+    return diagnostics
+
+
+def refine_transactions(transactions, cents=False):
+    """Convert the Date column of a raw Mint export to datetime64 and make
+    debit amounts negative, in place.
+    If cents is set to True, amounts are stored as int64 cents, otherwise
+    as float64 dollars.
+
+    """
+    transactions['Date'] = pd.to_datetime(transactions['Date'],
+                                          format=DATE_FORMAT)
+    is_debit = (transactions['Transaction Type'] == 'debit').values
+    if cents:
+        amounts = to_cents(transactions['Amount'])
+    else:
+        amounts = transactions['Amount'].values.astype(np.float64)
+    transactions['Amount'] = np.where(is_debit, -amounts, amounts)
+    return transactions
+
+
+def amounts_in_cents(transactions):
+    """Return whether the transactions' amounts are int64 cents (see
+    refine_transactions) rather than dollars.
+
+    """
+    return pd.api.types.is_integer_dtype(transactions['Amount'])
+
+
+def get_amount_formatters(transactions):
+    """Return the DataFrame formatters rendering int64 cents amounts the
+    way dollar amounts are rendered, or None for dollar amounts.
+
+    """
+    if not amounts_in_cents(transactions):
+        return None
+    return {'Amount': lambda x: f'{x / 100:.2f}'}
+
+
+def restore_missing_text(transactions):
+    """Return the transactions with missing values of object columns set
+    to NaN, as Parquet and Feather files read them back as None.
+
+    """
+    columns = transactions.columns[transactions.dtypes.values == object]
+    for column in columns:
+        values = transactions[column]
+        transactions[column] = values.where(values.notna(), np.nan)
+    return transactions
+
+
+def get_compact_text_dtype():
+    """Return the most compact string dtype available to this version of
+    pandas (Arrow backed strings), otherwise the object dtype.
+
+    """
+    try:
+        return pd.StringDtype('pyarrow')
+    except (AttributeError, ImportError, TypeError):
+        return np.dtype(object)
+
+
+def compact_transactions(transactions):
+    """Return the transactions with repeated labels stored as categoricals
+    and free text stored with a compact string dtype.
+
+    """
+    dtypes = dict()
+    text_dtype = get_compact_text_dtype()
+    for column in transactions.columns:
+        if column in CATEGORICAL_COLUMNS:
+            dtypes[column] = 'category'
+        elif column in TEXT_COLUMNS:
+            dtypes[column] = text_dtype
+    return transactions.astype(dtypes)
+
+
+def memory_report(transactions):
+    """Return a DataFrame breaking down the bytes used by every column of
+    the transactions (including the index) along with a total.
+
+    """
+    usage = transactions.memory_usage(index=True, deep=True)
+    report = pd.DataFrame({'Dtype': transactions.dtypes.astype(str),
+                           'Bytes': usage})
+    report.loc['Index', 'Dtype'] = type(transactions.index).__name__
+    report['Share'] = report['Bytes'] / usage.sum()
+    report = report.sort_values('Bytes', ascending=False)
+    report.loc['Total'] = ['', usage.sum(), 1]
+    report['Bytes'] = report['Bytes'].astype('int64')
+    return report
+
+
+def refine_and_classify(transactions, recurring, investments, cache=True,
+                        cents=False, cache_state=None):
+    """Refine a raw Mint export (see refine_transactions) and add its Group
+    and Subgroup columns along with the merchant ID of every description
+    (see mintkit.core.merchants).
+    If cache is set to True, classifications are memoized on disk, or in
+    the given classification state (see classify_transactions_cached).
+
+    """
+    transactions = refine_transactions(transactions, cents=cents)
+    if cache:
+        transactions[['Group', 'Subgroup']] = classify_transactions_cached(
+            transactions, recurring, investments, state=cache_state)
+    else:
+        transactions[['Group', 'Subgroup']] = classify_transactions(
+            transactions, recurring, investments)
+    transactions[mintkit.core.merchants.MERCHANT_ID] = \
+        mintkit.core.merchants.get_merchant_ids(transactions['Description'])
+    return transactions
+
+
+def iter_transactions(file_path=None, chunksize=CHUNKSIZE, cache=True,
+                      compact=False, cents=False):
+    """Yield refined and classified chunks of at most chunksize rows from
+    the specified Mint transactions file, so that memory use does not grow
+    with the length of the export's history.
+    The template and classification cache are read once and chunks keep
+    the export's row order; new classifications are saved to the cache
+    once every chunk was yielded.
 
     """
     if file_path is None:
         file_path = get_latest_file_location()
-    transactions = pd.read_csv(file_path)
-    if not refine:
-        return transactions
-    transactions['Date'] = transactions['Date'].map(
-        lambda x: pd.Timestamp(x).date())
-    transactions['Amount'] = transactions.apply(
-        lambda x:
-        -x['Amount'] if x['Transaction Type'] == 'debit'
-        else x['Amount'], axis=1)
     recurring = get_recurring()
     investments = get_investments()
-    transactions[['Group', 'Subgroup']] = transactions.apply(
-        apply_transaction_groups,
-        axis=1,
-        result_type='expand',
-        args=(recurring, investments))
+    state = None
+    if cache:
+        state = load_classification_state(recurring, investments)
+    reader = pd.read_csv(file_path, dtype=TRANSACTION_DTYPES,
+                         chunksize=chunksize)
+    for chunk in reader:
+        chunk = refine_and_classify(chunk, recurring, investments,
+                                    cache=cache, cents=cents,
+                                    cache_state=state)
+        if compact:
+            chunk = compact_transactions(chunk)
+        yield chunk
+    if state is not None and state['changed']:
+        save_classification_cache(state['hash'], state['cache'])
+
+
+def get_transactions(file_path=None, refine=True, cache=True, compact=False,
+                     cents=False, chunksize=None, store=False,
+                     snapshot=False, merge=False):
+    """Return a dataframe of the most specified Mint transactions file.
+    If refine is set to True, then column types and values will be
+    adjusted, the new Group and Subgroup columns will be added and the
+    transactions will be sorted by date.
+    If cache is set to True, classifications are memoized on disk and
+    only transactions with unseen classification keys are classified.
+    If compact is set to True, repeated labels are stored as categoricals
+    and free text with a compact string dtype (see memory_report).
+    If cents is set to True, amounts are carried as int64 cents through
+    every aggregation and only converted to dollars by usd.
+    If chunksize is given, the file is refined and classified in chunks
+    (see iter_transactions) before being concatenated.
+    If store is set to True, the file is merged into the on-disk
+    transaction store (see mintkit.core.store.update_store) and the
+    transactions are read back from the store; without any downloaded
+    export, the stored transactions are only refreshed (see
+    mintkit.core.store.refresh_store) and returned.
+    If snapshot is set to True, the result is loaded from a memory-mapped
+    snapshot when the export, template and options are unchanged since it
+    was saved, and saved as the new snapshot otherwise (along with a new
+    search index, see mintkit.core.search); this requires an export.
+    If merge is set to True, every downloaded transactions file is merged
+    (see get_merged_transactions) instead of reading a single file; this
+    cannot be combined with chunksize, store or snapshot.
+
+    """
+    if merge:
+        if chunksize is not None or store or snapshot:
+            raise ValueError('Merged exports cannot be chunked, stored '
+                             'or snapshot.')
+        if not refine:
+            return get_merged_transactions()
+    elif file_path is None and (not store or get_all_file_locations()):
+        file_path = get_latest_file_location()
+    if not refine:
+        return pd.read_csv(file_path)
+    snapshot = snapshot and file_path is not None
+    if snapshot:
+        options = {'compact': compact, 'cents': cents, 'store': store}
+        transactions = mintkit.core.snapshot.load_snapshot(
+            file_path, cfg.paths.template, options)
+        if transactions is not None:
+            transactions = restore_missing_text(transactions)
+            if compact:
+                transactions = compact_transactions(transactions)
+            return transactions
+    if store:
+        if file_path is not None:
+            mintkit.core.store.update_store(file_path)
+        else:
+            mintkit.core.store.refresh_store(get_recurring(),
+                                             get_investments())
+        transactions = mintkit.core.store.load_store()
+        if cents:
+            transactions['Amount'] = to_cents(transactions['Amount'])
+    elif chunksize is None:
+        if merge:
+            transactions = get_merged_transactions()
+        else:
+            transactions = pd.read_csv(file_path, dtype=TRANSACTION_DTYPES)
+        transactions = refine_and_classify(
+            transactions, get_recurring(), get_investments(), cache=cache,
+            cents=cents)
+    else:
+        chunks = iter_transactions(file_path, chunksize=chunksize,
+                                   cache=cache, cents=cents)
+        transactions = pd.concat(chunks, ignore_index=True)
+    transactions = transactions.sort_values('Date', kind='mergesort')
+    transactions = transactions.reset_index(drop=True)
+    if compact:
+        transactions = compact_transactions(transactions)
+    if snapshot:
+        mintkit.core.snapshot.save_snapshot(
+            transactions, file_path, cfg.paths.template, options)
+        mintkit.core.search.save_search_index(
+            mintkit.core.search.build_search_index(transactions))
     return transactions
 
 
@@ -206,10 +628,33 @@ def get_date_index(start_date, end_date):
 
     """
     date_index = pd.date_range(start_date, end_date)
-    date_index = date_index.map(lambda x: x.date())
     return date_index
 
 
+def get_date_window(transactions, start_date=None, end_date=None):
+    """Return the transactions dated on or after the start date and before
+    the end date (either bound may be None).
+    Date-sorted transactions are sliced by binary search without a copy,
+    otherwise the window is found with a boolean mask.
+
+    """
+    dates = transactions['Date']
+    if dates.is_monotonic_increasing:
+        start = 0
+        stop = len(transactions)
+        if start_date is not None:
+            start = dates.searchsorted(pd.Timestamp(start_date))
+        if end_date is not None:
+            stop = dates.searchsorted(pd.Timestamp(end_date))
+        return transactions.iloc[start:stop]
+    in_window = np.ones(len(transactions), dtype=bool)
+    if start_date is not None:
+        in_window &= (dates >= pd.Timestamp(start_date)).values
+    if end_date is not None:
+        in_window &= (dates < pd.Timestamp(end_date)).values
+    return transactions[in_window]
+
+
 def get_group_index(recurring, investments):
     """Return a MultiIndex with Groups and Subgroups that should be
     left-mergeable with summaries derived from Transaction data.
@@ -235,20 +680,36 @@ def get_group_index(recurring, investments):
     return group_index
 
 
-def get_spending_by_day(transactions=None, lookback=5, append_total=False):
+def get_spending_by_day(transactions=None, lookback=5, append_total=False,
+                        session=None, cube=None):
     """Return a DataFrame containing a summary of discretionary
     spending over the given lookback period.
     If total is set to True, the total spending sum over the lookback period
     will be included at the bottom of the returned dataframe.
+    If a session is given, its transactions and date index are used.
+    If a rollup cube is given (see mintkit.core.cube), or the session has
+    one, it is used in place of the transactions.
 
     """
+    if cube is None and session is not None:
+        cube = session.cube
+    if cube is not None:
+        transactions = cube
+    elif session is not None:
+        transactions = session.transactions
     if transactions is None:
         transactions = get_transactions()
-    today = datetime.date.today()
-    lookback_date = today - datetime.timedelta(days=lookback)
-    discr = transactions[transactions['Group'] == 'Discretionary']
-    discr = discr[discr['Date'] >= lookback_date]
-    discretionary_count = len(discr)
+    today = pd.Timestamp.today().normalize()
+    lookback_date = today - pd.Timedelta(days=lookback)
+    if session is not None and cube is None:
+        discr = session.get_window(lookback_date)
+    else:
+        discr = get_date_window(transactions, lookback_date)
+    discr = discr[discr['Group'] == 'Discretionary']
+    if cube is not None:
+        discretionary_count = int(discr['Count'].sum())
+    else:
+        discretionary_count = len(discr)
     day_grp = discr.groupby('Date')
     day_spend = day_grp[['Amount']].sum()
     date_index = get_date_index(lookback_date, today)
@@ -258,6 +719,8 @@ def get_spending_by_day(transactions=None, lookback=5, append_total=False):
     day_spend = day_spend[['Day', 'Amount']]
     day_spend = day_spend.reset_index(drop=True)
     day_spend['Amount'] = day_spend['Amount'].fillna(0)
+    if amounts_in_cents(transactions):
+        day_spend['Amount'] = day_spend['Amount'].astype(np.int64)
     if append_total:
         statlen = len(day_spend)
         day_spend.loc[statlen, 'Day'] = 'Total'
@@ -265,24 +728,81 @@ def get_spending_by_day(transactions=None, lookback=5, append_total=False):
     return day_spend, discretionary_count
 
 
+def get_rolling_spending(transactions=None, windows=None, end_date=None,
+                         session=None, cube=None):
+    """Return a DataFrame of the discretionary amount spent, number of
+    items and amount spent per day over rolling windows (7, 30 and 90 days
+    by default) ending on every day from the first transaction to the end
+    date (today by default), indexed by date.
+    Daily totals are resampled onto a contiguous calendar once and every
+    window is a difference of their cumulative sums.
+    If a session is given, its transactions are used.
+    If a rollup cube is given (see mintkit.core.cube), it is used in place
+    of the transactions.
+
+    """
+    if cube is not None:
+        transactions = cube
+    elif session is not None:
+        transactions = session.transactions
+    if transactions is None:
+        transactions = get_transactions()
+    if windows is None:
+        windows = ROLLING_WINDOWS
+    if end_date is None:
+        end_date = pd.Timestamp.today().normalize()
+    discr = transactions[(transactions['Group'] == 'Discretionary').values]
+    day_grp = discr.groupby('Date')
+    daily = pd.DataFrame({'Amount': day_grp['Amount'].sum()})
+    if cube is not None:
+        daily['Count'] = day_grp['Count'].sum()
+    else:
+        daily['Count'] = day_grp.size()
+    start_date = transactions['Date'].min()
+    end_date = max(pd.Timestamp(end_date), transactions['Date'].max())
+    daily = daily.reindex(get_date_index(start_date, end_date), fill_value=0)
+    spent = np.cumsum(daily['Amount'].values)
+    count = np.cumsum(daily['Count'].values)
+    elapsed = np.arange(1, len(daily) + 1)
+    rolling = pd.DataFrame(index=daily.index.rename('Date'))
+    for window in windows:
+        spent_lag = np.concatenate([np.zeros(window, spent.dtype), spent])
+        count_lag = np.concatenate([np.zeros(window, count.dtype), count])
+        rolling[f'Spent {window}d'] = spent - spent_lag[:len(spent)]
+        rolling[f'Items {window}d'] = count - count_lag[:len(count)]
+        rolling[f'Pace {window}d'] = (rolling[f'Spent {window}d']
+                                      / np.minimum(elapsed, window))
+    return rolling
+
+
 def get_spending_by_group(transactions=None, month=None,
-                          year=None, append_net=True):
+                          year=None, append_net=True, session=None,
+                          cube=None):
     """Return a detailed DataFrame detailing transaction totals by group
     and subgroup.
+    If a session is given, its memoized view for the month is used.
+    If a rollup cube is given (see mintkit.core.cube), it is used in place
+    of the transactions.
 
     """
+    if cube is not None:
+        transactions = cube
+    elif session is not None:
+        return session.get_spending_by_group(month, year, append_net)
     if transactions is None:
         transactions = get_transactions()
     if month is None:
         month = datetime.date.today().month
     if year is None:
         year = datetime.datetime.today().year
-    month_df = transactions.copy()
-    month_df = month_df[month_df['Date'].map(lambda x: x.year) == year]
-    month_df = month_df[month_df['Date'].map(lambda x: x.month) == month]
-    group_grp = month_df.groupby(['Group', 'Subgroup', 'Transaction Type'])
-    group_spend = group_grp.agg('sum')
+    month_df = get_date_window(transactions,
+                               pd.Timestamp(year, month, 1),
+                               get_next_month_start(month, year))
+    group_grp = month_df.groupby(['Group', 'Subgroup', 'Transaction Type'],
+                                 observed=True)
+    group_spend = group_grp[['Amount']].agg('sum')
     group_spend = group_spend.unstack(level=2)
+    group_spend = group_spend.sort_index().sort_index(axis=1)
     group_spend.columns = [x[1] for x in group_spend.columns]
     cols = ['debit', 'credit']
     for c in cols:
@@ -290,6 +810,8 @@ def get_spending_by_group(transactions=None, month=None,
             group_spend[c] = 0
     group_spend = group_spend.reindex(GROUPS, level=0)
     group_spend = group_spend.fillna(0)
+    if amounts_in_cents(transactions):
+        group_spend = group_spend.astype(np.int64)
     group_spend['net'] = group_spend.sum(axis=1)
     if append_net:
         group_spend.loc['Net', 'net'] = group_spend['net'].sum()
@@ -301,37 +823,138 @@ def get_excel_template_df(template_path=None):
     (Cash Flow.xlsm).
 
     """
-    if template_path is None:
-        template_path = cfg.paths.template
-    template = pd.read_excel(template_path, usecols='A:E', header=5)
-    template = template.rename(columns={'Unnamed: 0': 'Subgroup'})
+    sheets = mintkit.core.template.get_template_sheets(template_path)
+    template = sheets['Cash Flow'].rename(columns={'Unnamed: 0': 'Subgroup'})
     template = template.dropna(subset=['Subgroup'])
     template = template.drop('Realized', axis=1)
     return template
 
 
-def apply_cash_flow_projections(x):
-    """If the line item is income, return any nonzero realized items,
-    otherwise return the expected column's value.
-    If item is an expense, return the minimum between the expected
-    and realized values.
+def get_cash_flow_layout(recurring, investments, template_path=None,
+                         cents=False):
+    """Return a DataFrame of the Group, Subgroup and Expected amount of
+    every line item of the cash flow summary, in order.
 
     """
-    if x['Group'] == 'Income':
-        if x['Realized'] != 0:
-            return x['Realized']
-        else:
-            return x['Expected']
-    else:
-        return min(x['Expected'], x['Realized'])
+    template = get_excel_template_df(template_path)
+    template = template[['Subgroup', 'Expected']]
+    if cents:
+        template['Expected'] = to_cents(template['Expected'].fillna(0))
+    group_index = get_group_index(recurring, investments)
+    layout = group_index.to_frame(index=False)
+    layout = pd.merge(layout, template, how='left', on='Subgroup')
+    layout['Expected'] = layout['Expected'].fillna(0)
+    return layout
+
+
+def get_cash_flow_waterfall(layout, realized):
+    """Return the Expected, Projected, RemainingCF and RemainingNW arrays
+    of a matrix of realized amounts with one column per line item of the
+    cash flow layout (see get_cash_flow_layout) and one row per period.
+    Income items are projected as their realized amount if nonzero and
+    their expected amount otherwise, and expenses as the minimum of their
+    expected and realized amounts.
+    The remaining cash flow and net worth waterfalls are cumulative sums
+    across each row; remaining amounts are NaN outside of the line items
+    that end a step of the waterfall.
+
+    """
+    group = layout['Group'].values
+    subgroup = layout['Subgroup'].values
+    is_income = group == 'Income'
+    is_paycheck = is_income & np.isin(subgroup, ['Middle-of-Month',
+                                                 'End-of-Month'])
+    is_rent = group == 'Rent'
+    is_recur = group == 'Recurring'
+    is_invest = group == 'Investments'
+    is_disc = group == 'Discretionary'
+    is_last = group != np.append(group[1:], None)
+    expected = np.broadcast_to(layout['Expected'].values, realized.shape)
+    projected = np.where(is_income,
+                         np.where(realized != 0, realized, expected),
+                         np.minimum(expected, realized))
+    # Waterfall contributions of each line item
+    cf_items = np.where(is_paycheck | is_rent | is_recur | is_invest,
+                        projected, 0)
+    cf_items = np.where(is_disc, realized, cf_items)
+    nw_items = np.where(is_income | is_rent | is_recur, projected, 0)
+    nw_items = np.where(is_disc, realized, nw_items)
+    remaining_cf = np.cumsum(cf_items, axis=1)
+    remaining_nw = np.cumsum(nw_items, axis=1)
+    cf_before = np.hstack([np.zeros((len(realized), 1)),
+                           remaining_cf[:, :-1]])
+    # Remaining amounts are only reported after each step of the waterfall
+    is_cf_step = ((is_income & (subgroup == 'End-of-Month')) | is_rent
+                  | (is_last & (is_recur | is_invest)) | is_disc)
+    is_nw_step = is_rent | (is_last & (is_income | is_recur)) | is_disc
+    # Adjust special Discretionary expected case
+    expected = np.where(is_disc, np.minimum(-cf_before, 0), expected)
+    remaining_cf = np.where(is_cf_step, remaining_cf, np.nan)
+    remaining_nw = np.where(is_nw_step, remaining_nw, np.nan)
+    return expected, projected, remaining_cf, remaining_nw
+
+
+def get_cash_flow_matrix(transactions=None, recurring=None,
+                         investments=None, template_path=None, months=None):
+    """Return a DataFrame of the cash flow summary (see
+    get_cash_flow_summary) of every given month, indexed by Month, Group
+    and Subgroup.
+    Months may be given as Periods or 'YYYY-MM' strings and default to
+    every month spanned by the transactions.
+    Realized amounts are summed for all months in a single groupby and the
+    remaining cash flow and net worth waterfalls are cumulative sums over
+    a month by line item matrix, so no month is computed separately.
+
+    """
+    if transactions is None:
+        transactions = get_transactions()
+    if recurring is None:
+        recurring = get_recurring()
+    if investments is None:
+        investments = get_investments()
+    if months is None:
+        months = pd.period_range(transactions['Date'].min(),
+                                 transactions['Date'].max(), freq='M')
+    months = pd.PeriodIndex(months, freq='M')
+    layout = get_cash_flow_layout(recurring, investments, template_path,
+                                  amounts_in_cents(transactions))
+
+    window = get_date_window(transactions, months.min().start_time,
+                             (months.max() + 1).start_time)
+    month_key = window['Date'].dt.to_period('M').rename('Month')
+    realized = window.groupby([month_key, window['Group'],
+                               window['Subgroup']], observed=True)
+    realized = realized['Amount'].sum()
+
+    n_items = len(layout)
+    cash_flow = layout.iloc[np.tile(np.arange(n_items), len(months))]
+    cash_flow = cash_flow.reset_index(drop=True)
+    cash_flow.insert(0, 'Month', np.repeat(months, n_items))
+    realized = realized.reindex(pd.MultiIndex.from_arrays(
+        [cash_flow['Month'], cash_flow['Group'], cash_flow['Subgroup']]))
+    cash_flow.insert(3, 'Realized', realized.fillna(0).values)
+
+    expected, projected, remaining_cf, remaining_nw = \
+        get_cash_flow_waterfall(
+            layout, cash_flow['Realized'].values.reshape(-1, n_items))
+    cash_flow['Expected'] = expected.ravel()
+    cash_flow['Projected'] = projected.ravel()
+    cash_flow['RemainingCF'] = remaining_cf.ravel()
+    cash_flow['RemainingNW'] = remaining_nw.ravel()
+    cash_flow = cash_flow.set_index(['Month', 'Group', 'Subgroup'])
+    return cash_flow
 
 
 def get_cash_flow_summary(transactions=None, recurring=None, investments=None,
-                          template_path=None, month=None, year=None):
+                          template_path=None, month=None, year=None,
+                          session=None):
     """Return a DataFrame that replicates the cash flow summary
     as it would be structured in the template Excel sheet (Cash Flow.xlsm).
+    If a session is given, its memoized view for the month is used.
 
     """
+    if session is not None:
+        return session.get_cash_flow_summary(month, year)
     if transactions is None:
         transactions = get_transactions()
     if recurring is None:
@@ -339,72 +962,36 @@ def get_cash_flow_summary(transactions=None, recurring=None, investments=None,
     if investments is None:
         investments = get_investments()
 
-    template = get_excel_template_df(template_path)
-    template = template[['Subgroup', 'Expected']]
-
-    group_spend = get_spending_by_group(
-        transactions, month, year, append_net=False)
-    group_spend = group_spend.drop(['debit', 'credit'], axis=1)
-    group_spend = group_spend.rename(columns={'net': 'Realized'})
-    group_index = get_group_index(recurring, investments)
-    group_spend = group_spend.reindex(group_index)
-    group_spend = group_spend.reset_index()
-
-    cash_flow = pd.merge(group_spend, template,
-                         how='left',
-                         on='Subgroup')
-    cash_flow = cash_flow.fillna(0)
-    cash_flow['Projected'] = cash_flow.apply(
-        apply_cash_flow_projections, axis=1)
-    cash_flow['RemainingCF'] = np.NaN
-    cash_flow['RemainingNW'] = np.NaN
-    cash_flow = cash_flow.set_index(['Group', 'Subgroup'])
-    # Remaining after income
-    paycheck_rem = cash_flow.loc[('Income', 'Middle-of-Month'), 'Projected']
-    paycheck_rem += cash_flow.loc[('Income', 'End-of-Month'), 'Projected']
-    cash_flow.loc[('Income', 'End-of-Month'), 'RemainingCF'] = paycheck_rem
-    last_idx = [x[1] for x in cash_flow.index if x[0] == 'Income'][-1]
-    income_rem = cash_flow.loc[('Income', slice(None)), 'Projected'].sum()
-    cash_flow.loc[('Income', last_idx), 'RemainingNW'] = income_rem
-    # Remaining after rent
-    proj_rent = cash_flow.loc[('Rent', 'Mortgage & Rent'), 'Projected']
-    rent_rem_cf = paycheck_rem + proj_rent
-    rent_rem_nw = income_rem + proj_rent
-    cash_flow.loc[('Rent', 'Mortgage & Rent'), 'RemainingCF'] = rent_rem_cf
-    cash_flow.loc[('Rent', 'Mortgage & Rent'), 'RemainingNW'] = rent_rem_nw
-    # Remaining after recurring
-    proj_recur = cash_flow.loc[('Recurring', slice(None)), 'Projected'].sum()
-    recur_rem_cf = rent_rem_cf + proj_recur
-    recur_rem_nw = rent_rem_nw + proj_recur
-    last_idx = [x[1] for x in cash_flow.index if x[0] == 'Recurring'][-1]
-    cash_flow.loc[('Recurring', last_idx), 'RemainingCF'] = recur_rem_cf
-    cash_flow.loc[('Recurring', last_idx), 'RemainingNW'] = recur_rem_nw
-    # Remaining after investments
-    proj_invest = cash_flow.loc[('Investments', slice(None)),
-                                'Projected'].sum()
-    invest_rem_cf = recur_rem_cf + proj_invest
-    last_idx = [x[1] for x in cash_flow.index if x[0] == 'Investments'][-1]
-    cash_flow.loc[('Investments', last_idx), 'RemainingCF'] = invest_rem_cf
-    # Remaining after discretionary
-    real_disc = cash_flow.loc[('Discretionary', 'Discretionary'), 'Realized']
-    disc_rem_cf = invest_rem_cf + real_disc
-    disc_rem_nw = recur_rem_nw + real_disc
-    cash_flow.loc[('Discretionary', 'Discretionary'),
-                  'RemainingCF'] = disc_rem_cf
-    cash_flow.loc[('Discretionary', 'Discretionary'),
-                  'RemainingNW'] = disc_rem_nw
-    # Adjust special Discretionary expected case
-    cash_flow.loc[('Discretionary', 'Discretionary'),
-                  'Expected'] = min(-invest_rem_cf, 0)
+    today = datetime.date.today()
+    if month is None:
+        month = today.month
+    if year is None:
+        year = today.year
+    cash_flow = get_cash_flow_matrix(
+        transactions, recurring, investments, template_path,
+        months=[pd.Period(year=year, month=month, freq='M')])
+    cash_flow = cash_flow.reset_index(level='Month', drop=True)
     return cash_flow
 
 
 def get_current_month_spending_stats(transactions=None, recurring=None,
-                                     investments=None):
+                                     investments=None, session=None,
+                                     cube=None):
     """Return the amount spent, amount remaining, amount spent
     per day, and amount remaining per day for the given month.
+    If a session is given, its data and memoized views (built from its
+    rollup cube or running totals, if any) are used.
+    Otherwise, if a rollup cube covering the month is given (e.g. running
+    totals, see mintkit.core.running), it is used in place of the
+    transactions.
 
     """
+    if session is not None:
+        transactions = session.transactions
+        recurring = session.recurring
+        investments = session.investments
+    elif cube is not None:
+        transactions = cube
     if transactions is None:
         transactions = get_transactions()
     if recurring is None:
@@ -417,7 +1004,7 @@ def get_current_month_spending_stats(transactions=None, recurring=None,
     year = today.year
     cash_flow = get_cash_flow_summary(
         transactions=transactions, recurring=recurring,
-        investments=investments, month=month, year=year)
+        investments=investments, month=month, year=year, session=session)
     spent = cash_flow.loc[('Discretionary', 'Discretionary'), 'Realized']
     rem_cf = cash_flow.loc[('Discretionary', 'Discretionary'), 'RemainingCF']
     rem_nw = cash_flow.loc[('Discretionary', 'Discretionary'), 'RemainingNW']
@@ -430,29 +1017,157 @@ def get_current_month_spending_stats(transactions=None, recurring=None,
     return spent, spent_pace, rem_cf, rem_cf_pace, rem_nw, rem_nw_pace
 
 
-def get_current_auto_spending_stats(transactions=None):
+def get_spending_stats_as_of(dates, transactions=None, recurring=None,
+                             investments=None, template_path=None,
+                             session=None):
+    """Return a DataFrame of the amount spent, amount spent per day,
+    amount remaining and amount remaining per day (see
+    get_current_month_spending_stats) as they stood at the end of each of
+    the given dates, indexed by date.
+    Month-to-date realized amounts come from a prefix-sum index (see
+    mintkit.core.prefix) and the waterfall is computed for all dates at
+    once.
+    If a session is given, its data and prefix-sum index are used.
+
+    """
+    if session is not None:
+        transactions = session.transactions
+        recurring = session.recurring
+        investments = session.investments
+        template_path = session.template_path
+    if transactions is None:
+        transactions = get_transactions()
+    if recurring is None:
+        recurring = get_recurring()
+    if investments is None:
+        investments = get_investments()
+    if session is not None:
+        prefix_index = session.get_prefix_index()
+    else:
+        prefix_index = mintkit.core.prefix.PrefixSumIndex(transactions)
+    dates = pd.DatetimeIndex(dates).normalize()
+    layout = get_cash_flow_layout(recurring, investments, template_path,
+                                  amounts_in_cents(transactions))
+    month_starts = dates.to_period('M').start_time
+    realized = prefix_index.get_totals(month_starts,
+                                       dates + pd.Timedelta(days=1))
+    realized = realized.reindex(
+        columns=pd.MultiIndex.from_frame(layout[['Group', 'Subgroup']]),
+        fill_value=0)
+    _, _, remaining_cf, remaining_nw = get_cash_flow_waterfall(
+        layout, realized.values)
+    is_disc = (layout['Group'] == 'Discretionary').values
+    day = dates.day.values
+    # Only days left includes the given day
+    days_left = dates.days_in_month.values - day + 1
+    stats = pd.DataFrame(index=dates.rename('Date'))
+    stats['Spent'] = realized.values[:, is_disc][:, -1]
+    stats['RemainingCF'] = remaining_cf[:, is_disc][:, -1]
+    stats['RemainingNW'] = remaining_nw[:, is_disc][:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stats['SpentPace'] = stats['Spent'].values / (day - 1)
+    stats['RemainingCFPace'] = stats['RemainingCF'] / days_left
+    stats['RemainingNWPace'] = stats['RemainingNW'] / days_left
+    stats = stats[['Spent', 'SpentPace', 'RemainingCF', 'RemainingCFPace',
+                   'RemainingNW', 'RemainingNWPace']]
+    return stats
+
+
+def get_month_spending_series(month=None, year=None, transactions=None,
+                              recurring=None, investments=None,
+                              template_path=None, session=None):
+    """Return a DataFrame of the spending stats (see
+    get_spending_stats_as_of) as of every day of the given month.
+
+    """
+    today = datetime.date.today()
+    if month is None:
+        month = today.month
+    if year is None:
+        year = today.year
+    dates = pd.date_range(pd.Timestamp(year, month, 1),
+                          periods=get_days_in_month(month, year))
+    return get_spending_stats_as_of(dates, transactions, recurring,
+                                    investments, template_path, session)
+
+
+def get_watchlist_spending(transactions=None, watchlists=None, month=None,
+                           year=None, session=None, cube=None):
+    """Return a dictionary of DataFrames of the month's total amount by
+    category of every category watchlist (WATCHLISTS by default), in the
+    order of each watchlist's categories.
+    All watchlists are answered from a single groupby over the month's
+    transactions.
+    If a session is given, its monthly slice (or rollup) is used.
+    If a rollup cube is given (see mintkit.core.cube), it is used in place
+    of the transactions.
+
+    """
+    if cube is not None:
+        transactions = cube
+    elif session is not None:
+        transactions = session.transactions
     if transactions is None:
         transactions = get_transactions()
+    if watchlists is None:
+        watchlists = WATCHLISTS
     today = datetime.date.today()
-    day = today.day
-    month = today.month
-    year = today.year
-    first_of_month = datetime.date(year, month, 1)
-    monthly_trans = transactions[transactions['Date'] >= first_of_month]
-    auto_cat = ['Parking', 'Auto Insurance', 'Auto & Transport']
-    auto_df = monthly_trans[monthly_trans['Category'].isin(auto_cat)]
-    auto_stats = auto_df.groupby(['Category'])[['Amount']].sum()
-    auto_stats = auto_stats.reindex(auto_cat)
-    auto_stats = auto_stats.fillna(0)
-    return auto_stats
+    if month is None:
+        month = today.month
+    if year is None:
+        year = today.year
+    if session is not None and cube is None:
+        month_df = session.get_month_rollup(month, year)
+    else:
+        month_df = get_date_window(transactions,
+                                   pd.Timestamp(year, month, 1),
+                                   get_next_month_start(month, year))
+    categories = list(dict.fromkeys(
+        x for watchlist in watchlists.values() for x in watchlist))
+    watched = month_df[month_df['Category'].isin(categories).values]
+    category_spend = watched.groupby('Category', observed=True)[['Amount']]
+    category_spend = category_spend.sum()
+    category_spend.index = category_spend.index.astype(object)
+    cents = amounts_in_cents(transactions)
+    watchlist_spend = dict()
+    for name, watchlist in watchlists.items():
+        stats = category_spend.reindex(watchlist).fillna(0)
+        if cents:
+            stats = stats.astype(np.int64)
+        watchlist_spend[name] = stats
+    return watchlist_spend
+
+
+def get_current_auto_spending_stats(transactions=None, session=None,
+                                    cube=None):
+    """Return a DataFrame of the current month's total amount by category
+    of the Auto watchlist (see get_watchlist_spending).
+
+    """
+    watchlist_spend = get_watchlist_spending(
+        transactions, {'Auto': WATCHLISTS['Auto']}, session=session,
+        cube=cube)
+    return watchlist_spend['Auto']
 
 
 def get_recent_spending_summary(transactions=None, recurring=None,
-                                investments=None, lookback=5):
+                                investments=None, lookback=5, session=None,
+                                rolling=False, cube=None):
     """Return an HTML string summarizing recent discretionary spending
     activity.
+    If a session is given, its data and memoized views are used.
+    If rolling is set to True, the rolling spending stats as of today (see
+    get_rolling_spending) are appended.
+    If a rollup cube covering the current month is given without a session
+    (e.g. running totals, see mintkit.core.running), the month's stats are
+    computed from it; a session's own rollup cube and running totals are
+    used through its views.
 
     """
+    if session is not None:
+        transactions = session.transactions
+        recurring = session.recurring
+        investments = session.investments
     if transactions is None:
         transactions = get_transactions()
     if recurring is None:
@@ -460,7 +1175,8 @@ def get_recent_spending_summary(transactions=None, recurring=None,
     if investments is None:
         investments = get_investments()
     df_lookback, count_lookback = get_spending_by_day(
-        transactions=transactions, lookback=lookback, append_total=False)
+        transactions=transactions, lookback=lookback, append_total=False,
+        session=session)
     spent_lookback = df_lookback['Amount'].sum()
     spent_lookback_pace = spent_lookback / len(df_lookback)
     (spent,
@@ -470,16 +1186,34 @@ def get_recent_spending_summary(transactions=None, recurring=None,
      rem_nw,
      rem_nw_pace) = get_current_month_spending_stats(transactions=transactions,
                                                      recurring=recurring,
-                                                     investments=investments)
+                                                     investments=investments,
+                                                     session=session,
+                                                     cube=cube)
     today = datetime.date.today()
+    cents = amounts_in_cents(transactions)
+    formatters = get_amount_formatters(transactions)
     summary = f'{lookback:.0f}d: ({count_lookback:.0f} items)<br><br>'
-    summary += df_lookback.to_html(header=False, index=False)
-    summary += f'<br><br>Spent {lookback:.0f}d: {usd(spent_lookback, 0)}<br>'
-    summary += f'Pace {lookback:.0f}d: {usd(spent_lookback_pace, 0)}<br><br>'
-    summary += f'Spent {today:%b}: {usd(spent, 0)}<br>'
-    summary += f'Spent {today:%b}/Day: {usd(spent_pace, 0)}<br>'
-    summary += f'Remaining NW {today:%b}: {usd(rem_nw, 0)}<br>'
-    summary += f'Remaining NW/Day: {usd(rem_nw_pace, 0)}<br>'
-    summary += f'Remaining CF {today:%b}: {usd(rem_cf, 0)}<br>'
-    summary += f'Remaining CF/Day: {usd(rem_cf_pace, 0)}<br>'
+    summary += df_lookback.to_html(header=False, index=False,
+                                   formatters=formatters)
+    summary += f'<br><br>Spent {lookback:.0f}d: ' \
+               f'{usd(spent_lookback, 0, cents)}<br>'
+    summary += f'Pace {lookback:.0f}d: ' \
+               f'{usd(spent_lookback_pace, 0, cents)}<br><br>'
+    summary += f'Spent {today:%b}: {usd(spent, 0, cents)}<br>'
+    summary += f'Spent {today:%b}/Day: {usd(spent_pace, 0, cents)}<br>'
+    summary += f'Remaining NW {today:%b}: {usd(rem_nw, 0, cents)}<br>'
+    summary += f'Remaining NW/Day: {usd(rem_nw_pace, 0, cents)}<br>'
+    summary += f'Remaining CF {today:%b}: {usd(rem_cf, 0, cents)}<br>'
+    summary += f'Remaining CF/Day: {usd(rem_cf_pace, 0, cents)}<br>'
+    if rolling:
+        rolling_stats = get_rolling_spending(transactions)
+        latest = rolling_stats.loc[pd.Timestamp(today)]
+        summary += '<br>'
+        for window in ROLLING_WINDOWS:
+            spent_window = latest[f'Spent {window}d']
+            items_window = latest[f'Items {window}d']
+            pace_window = latest[f'Pace {window}d']
+            summary += f'Spent {window}d: {usd(spent_window, 0, cents)} ' \
+                       f'({items_window:.0f} items)<br>'
+            summary += f'Pace {window}d: {usd(pace_window, 0, cents)}<br>'
     return summary
@@ -0,0 +1,107 @@
+"""A persisted daily rollup cube of transaction amounts, refreshed
+incrementally for the dates whose transactions changed.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import pandas as pd
+import numpy as np
+import pickle
+import os
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+# Columns the cube is summed over
+CUBE_DIMENSIONS = ['Date', 'Group', 'Subgroup', 'Category',
+                   'Transaction Type']
+# On-disk cube
+CUBE_PATH = cfg.paths.user + 'cube.cache'
+
+
+def build_cube(transactions):
+    """Return a DataFrame of the amount and number of transactions per
+    date, group, subgroup, category and transaction type, sorted by date.
+    The cube has the same columns as the transactions it is built from
+    (plus Count), so it can stand in for them in any daily or monthly sum.
+
+    """
+    cube_grp = transactions.groupby(CUBE_DIMENSIONS, observed=True,
+                                    sort=True)
+    cube = cube_grp['Amount'].agg(['sum', 'size'])
+    cube = cube.rename(columns={'sum': 'Amount', 'size': 'Count'})
+    cube = cube.reset_index()
+    for column in CUBE_DIMENSIONS[1:]:
+        cube[column] = cube[column].astype(object)
+    return cube
+
+
+def get_day_signatures(transactions):
+    """Return a Series of a hash of every date's transactions, built from
+    the columns the cube depends on, so changed dates can be detected
+    without rebuilding the cube.
+
+    """
+    columns = CUBE_DIMENSIONS + ['Amount']
+    hashes = pd.util.hash_pandas_object(transactions[columns], index=False)
+    signatures = hashes.groupby(transactions['Date'].values).sum()
+    signatures.index.name = 'Date'
+    return signatures.astype(np.uint64)
+
+
+def load_cube():
+    """Return the cube and the day signatures it was built from, if saved.
+
+    """
+    if not os.path.isfile(CUBE_PATH):
+        return None, None
+    try:
+        with open(CUBE_PATH, 'rb') as file:
+            return pickle.load(file)
+    except Exception as e:
+        log.info(f'Rollup cube could not be loaded: {e}')
+        return None, None
+
+
+def save_cube(cube, signatures):
+    """Save the cube and its day signatures to the user's directory.
+
+    """
+    with open(CUBE_PATH, 'wb') as file:
+        pickle.dump((cube, signatures), file)
+
+
+def update_cube(transactions):
+    """Return the rollup cube of the transactions, refreshing the saved cube
+    only for the dates whose transactions were added, changed or removed
+    since it was saved.
+
+    """
+    signatures = get_day_signatures(transactions)
+    cube, saved = load_cube()
+    if cube is None or (len(cube) > 0
+                        and cube['Amount'].dtype
+                        != transactions['Amount'].dtype):
+        log.info('Building rollup cube.')
+        cube = build_cube(transactions)
+        save_cube(cube, signatures)
+        return cube
+    is_known = signatures.index.isin(saved.index)
+    is_touched = ~is_known
+    is_touched[is_known] = (
+        signatures.values[is_known]
+        != saved.reindex(signatures.index[is_known]).values)
+    touched = signatures.index[is_touched]
+    removed = saved.index[~saved.index.isin(signatures.index)]
+    if len(touched) == 0 and len(removed) == 0:
+        return cube
+    log.info(f'Refreshing rollup cube for {len(touched)} changed and '
+             f'{len(removed)} removed dates.')
+    is_stale = cube['Date'].isin(touched.append(removed))
+    fresh = build_cube(transactions[transactions['Date'].isin(touched)])
+    cube = pd.concat([cube[~is_stale.values], fresh], ignore_index=True,
+                     sort=False)
+    cube = cube.sort_values('Date', kind='mergesort')
+    cube = cube.reset_index(drop=True)
+    save_cube(cube, signatures)
+    return cube
@@ -0,0 +1,76 @@
+"""A sorted, month-partitioned index over transactions for date-range
+slicing by binary search.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import pandas as pd
+import numpy as np
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+
+class DateIndex:
+    def __init__(self, transactions):
+        """An index over transactions sorted by date with a precomputed
+        table of the first and last row of every month.
+        Any month or date window is found by binary search and returned as
+        a positional slice of the transactions, without copying rows.
+
+        """
+        if not transactions['Date'].is_monotonic_increasing:
+            transactions = transactions.sort_values('Date', kind='mergesort')
+            transactions = transactions.reset_index(drop=True)
+        self.transactions = transactions
+        self.dates = transactions['Date'].values.astype('datetime64[ns]')
+        months = self.dates.astype('datetime64[M]')
+        self.months, self.starts = np.unique(months, return_index=True)
+        self.stops = np.append(self.starts[1:], len(self.dates))
+
+    def __len__(self):
+        """Return the number of indexed transactions.
+
+        """
+        return len(self.dates)
+
+    def get_month_bounds(self, month, year):
+        """Return the positional start and stop of the given month's rows.
+
+        """
+        key = np.datetime64(f'{year:04d}-{month:02d}', 'M')
+        i = np.searchsorted(self.months, key)
+        if i < len(self.months) and self.months[i] == key:
+            return self.starts[i], self.stops[i]
+        position = self.starts[i] if i < len(self.months) else len(self)
+        return position, position
+
+    def get_month(self, month, year):
+        """Return the transactions dated in the given month.
+
+        """
+        start, stop = self.get_month_bounds(month, year)
+        return self.transactions.iloc[start:stop]
+
+    def get_window_bounds(self, start_date=None, end_date=None):
+        """Return the positional start and stop of the rows dated on or
+        after the start date and before the end date (either may be None).
+
+        """
+        start = 0
+        stop = len(self)
+        if start_date is not None:
+            start = np.searchsorted(
+                self.dates, np.datetime64(pd.Timestamp(start_date), 'ns'))
+        if end_date is not None:
+            stop = np.searchsorted(
+                self.dates, np.datetime64(pd.Timestamp(end_date), 'ns'))
+        return start, stop
+
+    def get_window(self, start_date=None, end_date=None):
+        """Return the transactions dated on or after the start date and
+        before the end date (either may be None).
+
+        """
+        start, stop = self.get_window_bounds(start_date, end_date)
+        return self.transactions.iloc[start:stop]
@@ -0,0 +1,159 @@
+"""Detection of recurring transactions from their cadence over the full
+transaction history.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import mintkit.core.analytics
+import mintkit.core.merchants
+import pandas as pd
+import numpy as np
+import os
+import re
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+# Cadences by name with their period and tolerance in days
+CADENCES = {'Weekly': (7, 1),
+            'Monthly': (30.44, 4),
+            'Annual': (365.25, 10)}
+# Relative width of the amount bands recurring transactions are grouped by
+AMOUNT_BAND = 0.1
+# Minimum number of occurrences of a candidate
+MIN_OCCURRENCES = 3
+# Minimum confidence of a candidate
+MIN_CONFIDENCE = 0.5
+# Groups decided before recurring rules are checked (see
+# mintkit.core.analytics.classify_transactions)
+DECIDED_GROUPS = ['Rent', 'Income', 'Investments', 'Wash']
+
+# Regular Expressions
+TRAILING_PUNCTUATION_RE = re.compile(r'[\W_]+$')
+METACHARACTER_RE = re.compile(r'([.^$*+?{}\[\]\\|()])')
+
+
+def get_amount_bands(amounts):
+    """Return an array of signed logarithmic amount bands, so amounts
+    within about AMOUNT_BAND of each other share a band.
+
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    magnitude = np.log(np.maximum(np.abs(amounts), 0.01))
+    bands = np.floor(magnitude / np.log1p(AMOUNT_BAND)).astype(np.int64)
+    return np.sign(amounts).astype(np.int64) * (bands + 1000)
+
+
+def get_cadence_match(intervals):
+    """Return the index of the cadence (in CADENCES order) each interval
+    in days matches, or -1.
+
+    """
+    periods = np.array([x[0] for x in CADENCES.values()])
+    tolerances = np.array([x[1] for x in CADENCES.values()])
+    distance = np.abs(np.asarray(intervals, dtype=np.float64)[:, None]
+                      - periods)
+    is_match = distance <= tolerances
+    return np.where(is_match.any(axis=1), is_match.argmax(axis=1), -1)
+
+
+def get_rule_pattern(descriptions):
+    """Return a regular expression matching the start shared by every
+    description.
+
+    """
+    prefix = os.path.commonprefix(list(descriptions))
+    prefix = TRAILING_PUNCTUATION_RE.sub('', prefix)
+    if not prefix:
+        prefix = pd.Series(descriptions).mode().iloc[0]
+    return METACHARACTER_RE.sub(r'\\\1', prefix)
+
+
+def detect_recurring(transactions=None, column='Description',
+                     min_occurrences=MIN_OCCURRENCES,
+                     min_confidence=MIN_CONFIDENCE):
+    """Return a DataFrame of candidate Recurring rules detected from the
+    cadence of transactions sharing a normalized merchant and amount band,
+    sorted by confidence.
+    Transactions are sorted once by merchant, band and date so the
+    intervals between consecutive occurrences are array differences; the
+    median interval picks the cadence and the confidence is the share of
+    intervals matching it, discounted for candidates with few occurrences.
+    Transactions already decided before recurring rules apply (rent,
+    income, investments and wash) are ignored.
+
+    """
+    if transactions is None:
+        transactions = mintkit.core.analytics.get_transactions()
+    is_candidate = ~transactions['Group'].isin(DECIDED_GROUPS).values
+    transactions = transactions[is_candidate]
+    merchant_id = mintkit.core.merchants.MERCHANT_ID
+    if (column == 'Description' and merchant_id in transactions
+            and pd.api.types.is_integer_dtype(transactions[merchant_id])):
+        merchant = transactions[merchant_id].values
+    else:
+        merchant = mintkit.core.merchants.get_merchant_ids(
+            transactions[column].values)
+    band = get_amount_bands(transactions['Amount'].values)
+    days = transactions['Date'].values.astype('datetime64[D]')
+    days = days.astype(np.int64)
+    order = np.lexsort((days, band, merchant))
+    merchant = merchant[order]
+    band = band[order]
+    days = days[order]
+    is_start = np.ones(len(order), dtype=bool)
+    is_start[1:] = (merchant[1:] != merchant[:-1]) | (band[1:] != band[:-1])
+    series = np.cumsum(is_start) - 1
+    # Intervals between consecutive occurrences of the same series
+    intervals = pd.DataFrame({'Series': series[1:],
+                              'Interval': np.diff(days)})
+    intervals = intervals[~is_start[1:] & (intervals['Interval'] > 0).values]
+    stats = intervals.groupby('Series')['Interval'].agg(['median', 'size'])
+    stats['Cadence'] = get_cadence_match(stats['median'].values)
+    stats = stats[stats['Cadence'] >= 0]
+    cadence = stats['Cadence'].reindex(intervals['Series']).values
+    is_regular = get_cadence_match(intervals['Interval'].values) == cadence
+    is_regular = pd.Series(is_regular, index=intervals['Series'].values)
+    stats['Regularity'] = is_regular[cadence >= 0].groupby(level=0).mean()
+    stats['Occurrences'] = stats['size'] + 1
+    stats['Confidence'] = (stats['Regularity']
+                           * (1 - 1 / stats['Occurrences']))
+    stats = stats[(stats['Occurrences'] >= min_occurrences)
+                  & (stats['Confidence'] >= min_confidence)]
+
+    rows = pd.DataFrame({'Series': series,
+                         'Description': transactions[column].values[order],
+                         'Amount': transactions['Amount'].values[order],
+                         'Date': transactions['Date'].values[order],
+                         'Group': transactions['Group'].values[order]})
+    rows = rows[rows['Series'].isin(stats.index).values]
+    series_grp = rows.groupby('Series')
+    names = list(CADENCES)
+    periods = np.array([CADENCES[x][0] for x in names])
+    period = periods[stats['Cadence'].values]
+    last_date = series_grp['Date'].max().reindex(stats.index)
+    latest = transactions['Date'].max()
+    amount = series_grp['Amount'].median().reindex(stats.index)
+    candidates = pd.DataFrame(index=stats.index)
+    candidates['Subgroup'] = [
+        x.title() for x in mintkit.core.merchants.get_merchant_names(
+            merchant[is_start][stats.index])]
+    candidates['Column'] = column
+    candidates['Pattern'] = series_grp['Description'].agg(
+        lambda x: get_rule_pattern(x.unique())).reindex(stats.index)
+    monthly = amount * CADENCES['Monthly'][0] / period
+    candidates['Expected'] = monthly.round(2)
+    candidates['Amount'] = amount
+    candidates['Cadence'] = [names[x] for x in stats['Cadence']]
+    candidates['Occurrences'] = stats['Occurrences']
+    candidates['Confidence'] = stats['Confidence'].round(3)
+    candidates['Last Date'] = last_date
+    candidates['Active'] = (
+        (latest - last_date).dt.days.values <= 1.5 * period)
+    candidates['Known'] = series_grp['Group'].agg(
+        lambda x: (x == 'Recurring').all()).reindex(stats.index)
+    candidates = candidates.sort_values(['Confidence', 'Occurrences'],
+                                        ascending=False)
+    candidates = candidates.reset_index(drop=True)
+    log.info(f'Detected {len(candidates)} recurring transaction candidates.')
+    return candidates
@@ -0,0 +1,97 @@
+"""A Monte Carlo forecast of month-end discretionary spending bootstrapped
+from daily spending history.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import mintkit.core.analytics
+import pandas as pd
+import numpy as np
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+# Number of simulated rest-of-month spending paths
+N_PATHS = 20000
+# Number of days of spending history resampled by the simulation
+HISTORY_DAYS = 90
+# Percentiles reported by the forecast
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def get_daily_spending(transactions, end_date, history_days=HISTORY_DAYS):
+    """Return an array of the discretionary amount spent on each of the
+    history days before the end date, including days without spending.
+
+    """
+    start_date = end_date - pd.Timedelta(days=history_days)
+    discr = mintkit.core.analytics.get_date_window(transactions, start_date,
+                                                   end_date)
+    discr = discr[(discr['Group'] == 'Discretionary').values]
+    daily = discr.groupby('Date')['Amount'].sum()
+    date_index = mintkit.core.analytics.get_date_index(
+        start_date, end_date - pd.Timedelta(days=1))
+    daily = daily.reindex(date_index, fill_value=0)
+    return daily.values
+
+
+def simulate_spending(daily, days, n_paths=N_PATHS, random_state=None):
+    """Return an (n_paths, days) array of cumulative spending paths, each
+    day's spending drawn with replacement from the daily history.
+
+    """
+    rng = np.random.default_rng(random_state)
+    draws = rng.choice(daily, size=(n_paths, days), replace=True)
+    return np.cumsum(draws, axis=1)
+
+
+def get_spending_forecast(transactions=None, recurring=None,
+                          investments=None, as_of=None, n_paths=N_PATHS,
+                          history_days=HISTORY_DAYS, percentiles=None,
+                          random_state=None, session=None):
+    """Return two DataFrames forecasting discretionary spending for the
+    rest of the month after the as of date (today by default):
+    percentile bands of the month-to-date amount spent for every remaining
+    day (starting with the as of date itself), and percentiles of the
+    month-end amount spent, RemainingCF and RemainingNW.
+    Every path is simulated at once by bootstrapping the daily spending of
+    the history days up to and including the as of date.
+    Amounts are signed, so low percentiles are the highest spending.
+    If a session is given, its data and prefix-sum index are used.
+
+    """
+    if session is not None:
+        transactions = session.transactions
+        recurring = session.recurring
+        investments = session.investments
+    if transactions is None:
+        transactions = mintkit.core.analytics.get_transactions()
+    if recurring is None:
+        recurring = mintkit.core.analytics.get_recurring()
+    if investments is None:
+        investments = mintkit.core.analytics.get_investments()
+    if as_of is None:
+        as_of = pd.Timestamp.today()
+    if percentiles is None:
+        percentiles = PERCENTILES
+    as_of = pd.Timestamp(as_of).normalize()
+    stats = mintkit.core.analytics.get_spending_stats_as_of(
+        [as_of], transactions, recurring, investments, session=session)
+    stats = stats.iloc[0]
+    days_left = as_of.days_in_month - as_of.day
+    daily = get_daily_spending(transactions, as_of + pd.Timedelta(days=1),
+                               history_days)
+    paths = simulate_spending(daily, days_left, n_paths, random_state)
+    paths = np.hstack([np.zeros((n_paths, 1), dtype=paths.dtype), paths])
+    log.debug(f'Simulated {n_paths} spending paths over {days_left} days.')
+    bands = np.percentile(paths, percentiles, axis=0).T + stats['Spent']
+    bands = pd.DataFrame(
+        bands, columns=percentiles,
+        index=pd.date_range(as_of, periods=days_left + 1, name='Date'))
+    future = np.percentile(paths[:, -1], percentiles)
+    month_end = pd.DataFrame(
+        {'Spent': stats['Spent'] + future,
+         'RemainingCF': stats['RemainingCF'] + future,
+         'RemainingNW': stats['RemainingNW'] + future},
+        index=pd.Index(percentiles, name='Percentile'))
+    return bands, month_end
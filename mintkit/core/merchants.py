@@ -0,0 +1,125 @@
+"""Canonicalization of transaction descriptions into merchants with
+interned integer merchant IDs.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import pandas as pd
+import numpy as np
+import functools
+import pickle
+import uuid
+import os
+import re
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+# Name of the column holding each transaction's merchant ID
+MERCHANT_ID = 'Merchant ID'
+# On-disk table of the merchant names by merchant ID along with its token
+MERCHANT_TABLE_PATH = cfg.paths.user + 'merchants.cache'
+
+# Regular Expressions
+PAYMENT_PREFIX_RE = re.compile(r'^(?:SQ|TST|PAYPAL|PP|SP)\s*\*\s*')
+MERCHANT_NOISE_RE = re.compile(r'[^A-Z& ]+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# In-process merchant table (token, names by ID and IDs by name)
+_merchant_table = {'token': None, 'names': None, 'ids': None}
+
+
+@functools.lru_cache(maxsize=None)
+def normalize_merchant(description):
+    """Return a merchant name stripped of payment processor prefixes,
+    store numbers, punctuation and repeated whitespace.
+
+    """
+    if not isinstance(description, str):
+        return ''
+    name = PAYMENT_PREFIX_RE.sub('', description.upper())
+    name = MERCHANT_NOISE_RE.sub(' ', name)
+    return WHITESPACE_RE.sub(' ', name).strip()
+
+
+def load_merchant_table():
+    """Return the list of merchant names indexed by merchant ID, loading it
+    from the user's directory on first use.
+    Without a saved table, a new one is started under a new token (see
+    get_merchant_table_token). A saved table that cannot be loaded raises
+    an error, as starting over would hand out merchant IDs already saved
+    with other merchants.
+
+    """
+    if _merchant_table['names'] is None:
+        if os.path.isfile(MERCHANT_TABLE_PATH):
+            try:
+                with open(MERCHANT_TABLE_PATH, 'rb') as file:
+                    table = pickle.load(file)
+                token, names = table['token'], table['names']
+            except Exception as e:
+                raise ValueError(
+                    f'Merchant table could not be loaded ({e}), delete '
+                    f'{MERCHANT_TABLE_PATH} to start a new one.') from e
+        else:
+            log.info('Starting a new merchant table.')
+            token, names = uuid.uuid4().hex, []
+        _merchant_table['token'] = token
+        _merchant_table['names'] = names
+        _merchant_table['ids'] = {x: i for i, x in enumerate(names)}
+        if not os.path.isfile(MERCHANT_TABLE_PATH):
+            save_merchant_table()
+    return _merchant_table['names']
+
+
+def save_merchant_table():
+    """Save the merchant table to the user's directory.
+
+    """
+    table = {'token': _merchant_table['token'],
+             'names': _merchant_table['names']}
+    with open(MERCHANT_TABLE_PATH, 'wb') as file:
+        pickle.dump(table, file)
+
+
+def get_merchant_table_token():
+    """Return the token of the merchant table.
+    Merchant IDs are only stable within a table, so whatever saves merchant
+    IDs (the transaction store and snapshot) also saves this token and
+    treats its IDs as invalid when the token changed.
+
+    """
+    load_merchant_table()
+    return _merchant_table['token']
+
+
+def get_merchant_ids(descriptions):
+    """Return an int32 array of the merchant ID of every description.
+    Each distinct description is normalized once and merchants are
+    interned in a persisted table, so IDs are stable across runs.
+
+    """
+    names = load_merchant_table()
+    ids = _merchant_table['ids']
+    codes, uniques = pd.factorize(
+        pd.Series(descriptions, dtype=object).fillna('').values)
+    n_merchants = len(names)
+    unique_ids = np.empty(len(uniques), dtype=np.int32)
+    for i, description in enumerate(uniques):
+        name = normalize_merchant(description)
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+        unique_ids[i] = ids[name]
+    if len(names) > n_merchants:
+        log.debug(f'Interned {len(names) - n_merchants} new merchants.')
+        save_merchant_table()
+    return unique_ids[codes]
+
+
+def get_merchant_names(merchant_ids):
+    """Return an object array of the merchant names of merchant IDs.
+
+    """
+    names = np.array(load_merchant_table(), dtype=object)
+    return names[np.asarray(merchant_ids)]
@@ -1,12 +1,14 @@
 import mintkit.config as cfg
 import mintkit.utils.logging
 import mintkit.core.analytics
+import mintkit.core.forecast
+from mintkit.utils.formatting import usd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+import matplotlib.ticker as mticker
 from pandas.plotting import register_matplotlib_converters
 import pandas as pd
 import numpy as np
-import datetime
 
 
 log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
@@ -14,12 +16,25 @@ register_matplotlib_converters()
 
 
 def plot_spending(transactions=None, recurring=None, investments=None,
-                  month=None, year=None):
+                  month=None, year=None, session=None, cube=None,
+                  forecast=False):
     """Plot actual spending by day alongside the linear prorated spending
     rate.
+    If a session is given, its data and memoized views are used.
+    If a rollup cube is given (see mintkit.core.cube), it is used in place
+    of the transactions.
+    If forecast is set to True and the current month is plotted, the
+    forecast spending bands (see mintkit.core.forecast) are drawn for the
+    rest of the month.
 
     """
-    today = datetime.date.today()
+    if session is not None:
+        transactions = session.transactions
+        recurring = session.recurring
+        investments = session.investments
+    if cube is not None:
+        transactions = cube
+    today = pd.Timestamp.today()
     if month is None:
         month = today.month
     if year is None:
@@ -30,31 +45,35 @@ def plot_spending(transactions=None, recurring=None, investments=None,
         recurring = mintkit.core.analytics.get_recurring()
     if investments is None:
         investments = mintkit.core.analytics.get_investments()
-    start_date = datetime.date(year, month, 1)
+    cents = mintkit.core.analytics.amounts_in_cents(transactions)
+    start_date = pd.Timestamp(year, month, 1)
     next_start = mintkit.core.analytics.get_next_month_start(month, year)
-    end_date = next_start - datetime.timedelta(days=1)
+    end_date = next_start - pd.Timedelta(days=1)
     days = mintkit.core.analytics.get_days_in_month(month, year)
-    discr = transactions.copy(deep=True)
-    discr = discr[discr['Group'] == 'Discretionary']
-    discr = discr[discr['Date'] >= start_date]
-    discr = discr[discr['Date'] <= end_date]
-    discr_grp = discr.groupby('Date')
-    discr_stats = discr_grp[['Amount']].sum()
-    discr_max_date = discr_stats.index.max()
-    if not isinstance(discr_max_date, datetime.date):
-        discr_max_date = pd.NaT
-    latest_date = max(datetime.date.today(), discr_max_date)
+    if session is not None and cube is None:
+        discr_stats = session.get_daily_discretionary(month, year)
+    else:
+        discr = mintkit.core.analytics.get_date_window(
+            transactions, start_date, next_start)
+        discr = discr[discr['Group'] == 'Discretionary']
+        discr_grp = discr.groupby('Date')
+        discr_stats = discr_grp[['Amount']].sum()
+    latest_date = today.normalize()
+    if len(discr_stats) > 0:
+        latest_date = max(latest_date, discr_stats.index.max())
     latest_date = min(latest_date, end_date)
     lhs = pd.DataFrame(
         columns=['Date'],
         data=mintkit.core.analytics.get_date_index(start_date, latest_date))
     discr_stats = pd.merge(lhs, discr_stats, how='left', on='Date')
     discr_stats['Amount'] = discr_stats['Amount'].fillna(0)
+    if cents:
+        discr_stats['Amount'] = discr_stats['Amount'].astype(np.int64)
     discr_stats['Amount'] = discr_stats['Amount'].cumsum()
     discr_stats['Amount'] *= -1
     cash_flow = mintkit.core.analytics.get_cash_flow_summary(
         transactions=transactions, recurring=recurring,
-        investments=investments, month=month, year=year)
+        investments=investments, month=month, year=year, session=session)
     discr_cf = cash_flow.loc[('Investments', slice(None)),
                              'RemainingCF'].iloc[-1]
     discr_nw = cash_flow.loc[('Recurring', slice(None)),
@@ -84,9 +103,20 @@ def plot_spending(transactions=None, recurring=None, investments=None,
     plt.plot_date(discr_dly['Date'], discr_dly['AllocatedCFExp'], '--')
     plt.plot_date(discr_dly['Date'], discr_dly['AllocatedCF'], '-')
     plt.plot_date(discr_stats['Date'], discr_stats['Amount'], '-')
+    if forecast and start_date <= today.normalize() <= end_date:
+        bands, _ = mintkit.core.forecast.get_spending_forecast(
+            transactions=transactions, recurring=recurring,
+            investments=investments, session=session)
+        bands = -bands
+        plt.fill_between(bands.index, bands[5], bands[95], alpha=0.15)
+        plt.fill_between(bands.index, bands[25], bands[75], alpha=0.3)
+        plt.plot_date(bands.index, bands[50], ':')
     plt.title('Spending By Day')
     plt.xticks(rotation=45)
     ax.xaxis.set_major_locator(mdates.DayLocator(interval=5))
+    if cents:
+        ax.yaxis.set_major_formatter(
+            mticker.FuncFormatter(lambda x, pos: usd(x, 0, cents=True)))
     plt.tight_layout()
     plt.savefig(str(cfg.paths.plots + r'spending.png'))
     plt.close()
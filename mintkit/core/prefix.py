@@ -0,0 +1,56 @@
+"""A cumulative-sum index of transaction amounts per group and subgroup
+for point-in-time spending queries.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import pandas as pd
+import numpy as np
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+
+class PrefixSumIndex:
+    def __init__(self, transactions):
+        """An index of the running total of transaction amounts per group
+        and subgroup over the distinct transaction dates.
+        The total of any date range is found by binary search of its
+        bounds followed by a subtraction of two running totals.
+
+        """
+        daily = transactions.groupby(['Date', 'Group', 'Subgroup'],
+                                     observed=True)['Amount'].sum()
+        daily = daily.unstack(['Group', 'Subgroup'], fill_value=0)
+        self.keys = pd.MultiIndex.from_tuples(
+            [(str(x), str(y)) for x, y in daily.columns],
+            names=['Group', 'Subgroup'])
+        self.dates = daily.index.values.astype('datetime64[ns]')
+        cumulative = np.cumsum(daily.values, axis=0)
+        self.cumulative = np.vstack(
+            [np.zeros((1, len(self.keys)), dtype=cumulative.dtype),
+             cumulative])
+
+    def _get_positions(self, dates):
+        """Return the number of indexed dates before each of the dates.
+
+        """
+        dates = pd.DatetimeIndex(dates).values.astype('datetime64[ns]')
+        return np.searchsorted(self.dates, dates)
+
+    def get_totals(self, start_dates, end_dates):
+        """Return a DataFrame of the amounts dated on or after each start
+        date and before the matching end date by group and subgroup, with
+        one row per pair of dates.
+
+        """
+        totals = (self.cumulative[self._get_positions(end_dates)]
+                  - self.cumulative[self._get_positions(start_dates)])
+        return pd.DataFrame(totals, columns=self.keys)
+
+    def get_total(self, start_date, end_date):
+        """Return a Series of the amounts dated on or after the start date
+        and before the end date by group and subgroup.
+
+        """
+        return self.get_totals([start_date], [end_date]).iloc[0]
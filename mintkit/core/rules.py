@@ -0,0 +1,303 @@
+"""A vectorized engine for matching transactions against the template's
+Recurring and Investments rules.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import pandas as pd
+import numpy as np
+import re
+import time
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+# Rule index used when no rule matches
+NO_MATCH = -1
+
+# Flags of a pattern compiled without any inline flags
+_DEFAULT_FLAGS = re.compile('').flags
+# Regex metacharacters that make a pattern more than a literal prefix
+_METACHARACTERS = set('.^$*+?{}[]|()')
+# Trie node key holding the index of the rule ending at that node
+_RULE_KEY = None
+
+
+def _split_literal_prefix(pattern):
+    """Return the leading literal characters of a pattern (ignoring a
+    leading '^' and unescaping escaped punctuation) and the remainder of
+    the pattern starting at its first metacharacter.
+
+    """
+    chars = []
+    i = 1 if pattern.startswith('^') else 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+                chars.append(pattern[i + 1])
+                i += 2
+                continue
+            break
+        if char in _METACHARACTERS:
+            break
+        chars.append(char)
+        i += 1
+    return ''.join(chars), pattern[i:]
+
+
+def get_literal_prefix(pattern):
+    """Return the literal string a pattern matches as a prefix if the
+    pattern is equivalent to a plain prefix test under re.match,
+    otherwise return None.
+    A leading '^', a trailing '.*' and escaped punctuation are allowed.
+
+    """
+    prefix, rest = _split_literal_prefix(pattern)
+    if rest in ('', '.*'):
+        return prefix
+    return None
+
+
+def get_required_prefix(pattern):
+    """Return a literal string that every value matched by the pattern
+    must start with (possibly empty).
+
+    """
+    prefix, rest = _split_literal_prefix(pattern)
+    if '|' in rest:
+        return ''
+    if rest[:1] in ('*', '?', '{'):
+        return prefix[:-1]
+    return prefix
+
+
+def _is_combinable(compiled):
+    """Return whether a compiled pattern can be safely embedded as one
+    alternative of a larger pattern.
+    Patterns with their own groups (and therefore possible backreferences)
+    or inline flags must be evaluated on their own.
+
+    """
+    return compiled.groups == 0 and compiled.flags == _DEFAULT_FLAGS
+
+
+class RuleSet:
+    def __init__(self, rules):
+        """A compiled, ordered set of template rules (e.g. the Recurring or
+        Investments sheet).
+        Each rule is evaluated with re.match semantics against its rule
+        column and the first matching rule in template order takes
+        precedence.
+        Plain prefix patterns are indexed in a per-column trie so that
+        only the prefixes of a value are visited; the remaining patterns
+        are evaluated as regular expressions.
+
+        """
+        self.index = rules.index.tolist()
+        self.subgroups = rules['Subgroup'].tolist()
+        self.columns = rules['Column'].tolist()
+        self.patterns = [str(x) for x in rules['Pattern'].tolist()]
+        self.compiled = [re.compile(x) for x in self.patterns]
+        self._column_rules = dict()
+        for i, column in enumerate(self.columns):
+            self._column_rules.setdefault(column, []).append(i)
+        self.paths = [None] * len(self.patterns)
+        self._tries = dict()
+        self._combined = dict()
+        self._single = dict()
+        for column, indices in self._column_rules.items():
+            self._compile_column(column, indices)
+
+    def __len__(self):
+        """Return the number of rules.
+
+        """
+        return len(self.patterns)
+
+    def _compile_column(self, column, indices):
+        """Index the literal prefix rules for one column in a trie and
+        compile its remaining rules into a single alternation of named
+        groups, keeping aside any patterns that cannot be combined.
+        Alternatives are tried left to right, so the first matching group
+        is always the earliest matching rule.
+
+        """
+        trie = dict()
+        regex = []
+        for i in indices:
+            prefix = get_literal_prefix(self.patterns[i])
+            if prefix is None:
+                regex.append(i)
+                continue
+            self.paths[i] = 'Trie'
+            node = trie
+            for char in prefix:
+                node = node.setdefault(char, dict())
+            node.setdefault(_RULE_KEY, i)
+        self._tries[column] = trie
+        combinable = [i for i in regex if _is_combinable(self.compiled[i])]
+        single = [i for i in regex if i not in combinable]
+        for i in combinable:
+            self.paths[i] = 'Alternation'
+        for i in single:
+            self.paths[i] = 'Regex'
+        if combinable:
+            combined = '|'.join(f'(?P<r{i}>{self.patterns[i]})'
+                                for i in combinable)
+            self._combined[column] = (combinable[0], re.compile(combined))
+        self._single[column] = single
+
+    def _match_value(self, column, value):
+        """Return the index of the first rule in the column matching the
+        given value, otherwise NO_MATCH.
+
+        """
+        if not isinstance(value, str):
+            return NO_MATCH
+        best = len(self.patterns)
+        node = self._tries[column]
+        if _RULE_KEY in node:
+            best = node[_RULE_KEY]
+        for char in value:
+            node = node.get(char)
+            if node is None:
+                break
+            if node.get(_RULE_KEY, best) < best:
+                best = node[_RULE_KEY]
+        first, combined = self._combined.get(column, (best, None))
+        if first < best:
+            match = combined.match(value)
+            if match:
+                best = min(best, int(match.lastgroup[1:]))
+        for i in self._single[column]:
+            if i >= best:
+                break
+            if self.compiled[i].match(value):
+                best = i
+                break
+        if best == len(self.patterns):
+            return NO_MATCH
+        return best
+
+    def match(self, transactions):
+        """Return an array with the index of the first matching rule for
+        every transaction (NO_MATCH where no rule matches).
+        Every distinct value of a rule column is only evaluated once.
+
+        """
+        best = np.full(len(transactions), len(self.patterns), dtype=np.int64)
+        for column in self._column_rules:
+            codes, uniques = pd.factorize(transactions[column])
+            first = np.array(
+                [self._match_value(column, x) for x in uniques] + [NO_MATCH],
+                dtype=np.int64)
+            first[first == NO_MATCH] = len(self.patterns)
+            best = np.minimum(best, first[codes])
+        best[best == len(self.patterns)] = NO_MATCH
+        return best
+
+    def get_subgroups(self, indices):
+        """Return an object array of subgroups for the given rule indices
+        (None where no rule matched).
+
+        """
+        subgroups = np.array(self.subgroups + [None], dtype=object)
+        return subgroups[np.asarray(indices)]
+
+    def get_shadowing_rules(self):
+        """Return a list with, for every rule, the index of an earlier rule
+        on the same column that matches everything it matches (None if no
+        such rule is found).
+        A rule is shadowed when it repeats an earlier pattern or when every
+        value it can match starts with an earlier literal prefix rule.
+
+        """
+        shadowed_by = [None] * len(self)
+        for indices in self._column_rules.values():
+            for n, j in enumerate(indices):
+                required = get_required_prefix(self.patterns[j])
+                for i in indices[:n]:
+                    literal = get_literal_prefix(self.patterns[i])
+                    if self.patterns[i] == self.patterns[j] or (
+                            literal is not None
+                            and required.startswith(literal)):
+                        shadowed_by[j] = i
+                        break
+        return shadowed_by
+
+    def time_columns(self, transactions):
+        """Return a dictionary of the seconds spent matching each rule
+        column of the transactions along the same path as match (the trie,
+        the alternation and the remaining regular expressions, once per
+        distinct value).
+
+        """
+        seconds = dict()
+        for column in self._column_rules:
+            _, uniques = pd.factorize(transactions[column])
+            start = time.perf_counter()
+            for value in uniques:
+                self._match_value(column, value)
+            seconds[column] = time.perf_counter() - start
+        return seconds
+
+    def profile(self, transactions):
+        """Return a DataFrame of diagnostics for every rule.
+        Evaluations and Matches count the transactions a rule is tested
+        against and wins under first-match precedence, Hits counts the
+        transactions the rule would match on its own and Shadowed By holds
+        the earlier rule that fully shadows it.
+        Path is the matching path the rule is compiled into and Column
+        Seconds is the time match actually spends on the rule's column (see
+        time_columns), the production cost shared by that column's rules.
+        Isolated Seconds is a separate per-rule benchmark, the cumulative
+        time of evaluating each rule on its own in template order; it
+        ranks individual patterns but does not describe the cost of match.
+
+        """
+        evaluations = np.zeros(len(self), dtype=np.int64)
+        matches = np.zeros(len(self), dtype=np.int64)
+        hits = np.zeros(len(self), dtype=np.int64)
+        seconds = np.zeros(len(self))
+        columns = list(self._column_rules)
+        if len(transactions) > 0 and columns:
+            codes = np.column_stack(
+                [pd.factorize(transactions[c])[0] for c in columns])
+            _, first, counts = np.unique(
+                codes, axis=0, return_index=True, return_counts=True)
+            combos = transactions[columns].iloc[first].values
+        else:
+            combos, counts = [], []
+        for combo, count in zip(combos, counts):
+            values = dict(zip(columns, combo))
+            matched = False
+            for i, compiled in enumerate(self.compiled):
+                value = values[self.columns[i]]
+                start = time.perf_counter()
+                hit = isinstance(value, str) and bool(compiled.match(value))
+                elapsed = time.perf_counter() - start
+                if not matched:
+                    evaluations[i] += count
+                    seconds[i] += elapsed * count
+                    if hit:
+                        matches[i] += count
+                        matched = True
+                if hit:
+                    hits[i] += count
+        column_seconds = self.time_columns(transactions)
+        shadowed_by = [None if x is None else self.index[x]
+                       for x in self.get_shadowing_rules()]
+        stats = pd.DataFrame(
+            {'Subgroup': self.subgroups,
+             'Column': self.columns,
+             'Pattern': self.patterns,
+             'Evaluations': evaluations,
+             'Matches': matches,
+             'Hits': hits,
+             'Path': self.paths,
+             'Column Seconds': [column_seconds[x] for x in self.columns],
+             'Isolated Seconds': seconds,
+             'Shadowed By': np.array(shadowed_by, dtype=object)},
+            index=self.index)
+        return stats
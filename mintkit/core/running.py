@@ -0,0 +1,126 @@
+"""A persisted running total of the current month's transactions, updated
+with the delta of new, changed and removed transactions.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import mintkit.core.analytics
+import mintkit.core.cube
+import mintkit.core.store
+import pandas as pd
+import numpy as np
+import pickle
+import os
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+# On-disk running totals
+RUNNING_TOTALS_PATH = cfg.paths.user + 'running.state'
+# Columns identifying a transaction's contribution to the running totals
+CONTRIBUTION_COLUMNS = (mintkit.core.cube.CUBE_DIMENSIONS
+                        + ['Amount', 'Description', 'Account Name'])
+
+
+class RunningTotals:
+    def __init__(self, month=None):
+        """An object holding the month's totals per date, group, subgroup,
+        category and transaction type (a rollup cube of the month, see
+        mintkit.core.cube) along with the fingerprint and contribution of
+        every transaction summed into them.
+        It can stand in for the transactions of the month (cube=) in the
+        analytics functions.
+
+        """
+        if month is None:
+            month = pd.Timestamp.today().to_period('M')
+        self.month = pd.Period(month, freq='M')
+        self.rows = None
+        self.totals = None
+
+    def reset(self, month):
+        """Forget every total and start over for the given month.
+
+        """
+        log.info(f'Resetting running totals for {month}.')
+        self.month = pd.Period(month, freq='M')
+        self.rows = None
+        self.totals = None
+
+    def _add(self, rows, sign):
+        """Add (sign 1) or subtract (sign -1) the contribution of rows to the
+        totals.
+
+        """
+        delta = mintkit.core.cube.build_cube(rows)
+        delta['Amount'] *= sign
+        delta['Count'] *= sign
+        totals = pd.concat([self.totals, delta], ignore_index=True,
+                           sort=False)
+        totals = totals.groupby(mintkit.core.cube.CUBE_DIMENSIONS,
+                                sort=True)[['Amount', 'Count']].sum()
+        totals = totals[totals['Count'].values != 0].reset_index()
+        totals['Amount'] = totals['Amount'].astype(delta['Amount'].dtype)
+        self.totals = totals
+
+    def update(self, transactions, today=None):
+        """Bring the totals up to date with the month's transactions,
+        resetting them when the month changed.
+        Only the month's rows are fingerprinted (date-sorted transactions
+        are sliced by binary search) and only the rows added or removed
+        since the last update are summed.
+
+        """
+        if today is None:
+            today = pd.Timestamp.today()
+        month = pd.Timestamp(today).to_period('M')
+        is_cents = mintkit.core.analytics.amounts_in_cents(transactions)
+        if (month != self.month or self.rows is None
+                or mintkit.core.analytics.amounts_in_cents(self.rows)
+                != is_cents):
+            self.reset(month)
+            self.rows = transactions.iloc[:0][CONTRIBUTION_COLUMNS]
+            self.rows.index = pd.Index([], dtype=np.uint64,
+                                       name=mintkit.core.store.FINGERPRINT)
+            self.totals = mintkit.core.cube.build_cube(self.rows)
+        month_df = mintkit.core.analytics.get_date_window(
+            transactions, month.start_time, (month + 1).start_time)
+        month_df = month_df[CONTRIBUTION_COLUMNS]
+        fingerprints = mintkit.core.store.get_row_fingerprints(
+            month_df, CONTRIBUTION_COLUMNS)
+        is_new = ~np.isin(fingerprints, self.rows.index.values)
+        is_removed = ~np.isin(self.rows.index.values, fingerprints)
+        if not is_new.any() and not is_removed.any():
+            return self
+        log.info(f'Updating running totals with {is_new.sum()} new and '
+                 f'{is_removed.sum()} removed transactions.')
+        new = month_df[is_new].copy()
+        new.index = pd.Index(fingerprints[is_new],
+                             name=mintkit.core.store.FINGERPRINT)
+        if is_removed.any():
+            self._add(self.rows[is_removed], -1)
+        if is_new.any():
+            self._add(new, 1)
+        self.rows = pd.concat([self.rows[~is_removed], new], sort=False)
+        return self
+
+    def save(self):
+        """Save the running totals to the user's directory.
+
+        """
+        with open(RUNNING_TOTALS_PATH, 'wb') as file:
+            pickle.dump(self, file)
+
+
+def load_running_totals():
+    """Return the running totals saved in the user's directory, or new
+    running totals for the current month.
+
+    """
+    if os.path.isfile(RUNNING_TOTALS_PATH):
+        try:
+            with open(RUNNING_TOTALS_PATH, 'rb') as file:
+                return pickle.load(file)
+        except Exception as e:
+            log.info(f'Running totals could not be loaded: {e}')
+    return RunningTotals()
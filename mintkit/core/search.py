@@ -0,0 +1,167 @@
+"""An inverted token index over the free text columns of the transactions
+for fast full-text search.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import pandas as pd
+import numpy as np
+import hashlib
+import pickle
+import os
+import re
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+# Columns indexed for search
+SEARCH_COLUMNS = ['Description', 'Original Description', 'Notes', 'Labels']
+# On-disk search index
+SEARCH_INDEX_PATH = cfg.paths.user + 'search.index'
+
+# Regular Expressions
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Return the sorted distinct lowercase alphanumeric tokens of a text.
+
+    """
+    if not isinstance(text, str):
+        return []
+    return sorted(set(TOKEN_RE.findall(text.lower())))
+
+
+def get_transactions_key(transactions):
+    """Return a hash of the transactions' length and indexed text columns,
+    identifying the rows an index was built from.
+
+    """
+    hasher = hashlib.sha256(str(len(transactions)).encode())
+    columns = [x for x in SEARCH_COLUMNS if x in transactions]
+    if columns:
+        hashes = pd.util.hash_pandas_object(transactions[columns],
+                                           index=False)
+        hasher.update(hashes.values.tobytes())
+    return hasher.hexdigest()
+
+
+def get_token_rows(values, vocabulary):
+    """Return the token IDs and row positions of every token occurrence in
+    an array of texts, tokenizing each distinct text once and adding new
+    tokens to the vocabulary (a dictionary of token IDs by token).
+
+    """
+    codes, uniques = pd.factorize(values)
+    text_tokens = [[vocabulary.setdefault(token, len(vocabulary))
+                    for token in tokenize(x)] for x in uniques]
+    counts = np.array([len(x) for x in text_tokens], dtype=np.int64)
+    flat_tokens = np.array([y for x in text_tokens for y in x],
+                           dtype=np.int64)
+    starts = np.cumsum(counts) - counts
+    rows = np.flatnonzero(codes >= 0)
+    repeats = counts[codes[rows]]
+    row_starts = np.cumsum(repeats) - repeats
+    offsets = np.arange(repeats.sum()) - np.repeat(row_starts, repeats)
+    token_ids = flat_tokens[np.repeat(starts[codes[rows]], repeats)
+                            + offsets]
+    return token_ids, np.repeat(rows, repeats)
+
+
+def build_search_index(transactions):
+    """Return a dictionary holding the sorted tokens of the transactions'
+    text columns, the sorted row positions (in the transactions' order)
+    containing each token, and the key of the transactions.
+
+    """
+    vocabulary = dict()
+    token_ids = []
+    rows = []
+    for column in SEARCH_COLUMNS:
+        if column not in transactions:
+            continue
+        column_tokens, column_rows = get_token_rows(
+            transactions[column].values, vocabulary)
+        token_ids.append(column_tokens)
+        rows.append(column_rows)
+    tokens = np.array(list(vocabulary), dtype=object)
+    order = np.argsort(tokens)
+    rank = np.empty(len(tokens), dtype=np.int64)
+    rank[order] = np.arange(len(tokens))
+    token_ids = rank[np.concatenate(token_ids)] if token_ids else \
+        np.array([], dtype=np.int64)
+    rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+    postings = np.unique(token_ids * len(transactions) + rows)
+    posting_tokens = postings // max(len(transactions), 1)
+    offsets = np.searchsorted(posting_tokens, np.arange(len(tokens) + 1))
+    log.info(f'Indexed {len(tokens)} tokens over {len(transactions)} '
+             f'transactions.')
+    return {'key': get_transactions_key(transactions),
+            'tokens': tokens[order],
+            'offsets': offsets,
+            'rows': (postings % max(len(transactions), 1)).astype(np.int32)}
+
+
+def load_search_index():
+    """Return the search index saved in the user's directory, if any.
+
+    """
+    if not os.path.isfile(SEARCH_INDEX_PATH):
+        return None
+    try:
+        with open(SEARCH_INDEX_PATH, 'rb') as file:
+            return pickle.load(file)
+    except Exception as e:
+        log.info(f'Search index could not be loaded: {e}')
+        return None
+
+
+def save_search_index(index):
+    """Save the search index to the user's directory.
+
+    """
+    with open(SEARCH_INDEX_PATH, 'wb') as file:
+        pickle.dump(index, file)
+
+
+def get_search_index(transactions):
+    """Return the search index of the transactions, rebuilding and saving
+    it only if the saved index was built from other transactions.
+
+    """
+    index = load_search_index()
+    if index is None or index['key'] != get_transactions_key(transactions):
+        index = build_search_index(transactions)
+        save_search_index(index)
+    return index
+
+
+def get_token_matches(index, token):
+    """Return the sorted row positions containing a token starting with
+    the given token.
+
+    """
+    tokens = index['tokens']
+    start = np.searchsorted(tokens, token)
+    stop = np.searchsorted(tokens, token + '\uffff')
+    rows = index['rows'][index['offsets'][start]:index['offsets'][stop]]
+    return np.unique(rows)
+
+
+def search(transactions, query, index=None):
+    """Return the transactions whose text columns contain every token of
+    the query, each query token matching any indexed token it starts.
+
+    """
+    if index is None:
+        index = get_search_index(transactions)
+    tokens = tokenize(query)
+    if not tokens:
+        return transactions.iloc[:0]
+    rows = get_token_matches(index, tokens[0])
+    for token in tokens[1:]:
+        if len(rows) == 0:
+            break
+        rows = np.intersect1d(rows, get_token_matches(index, token),
+                              assume_unique=True)
+    return transactions.iloc[rows]
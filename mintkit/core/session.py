@@ -0,0 +1,151 @@
+"""A session object sharing transactions, template rules and memoized
+derived views across the analytics and plotting functions of a run.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import mintkit.core.analytics
+import mintkit.core.dateindex
+import mintkit.core.prefix
+import pandas as pd
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+
+class AnalyticsSession:
+    def __init__(self, transactions=None, recurring=None, investments=None,
+                 template_path=None, cube=None, running=None):
+        """An object owning the transactions, recurring and investment rules
+        of a run. Views derived for a given month and year (monthly slice,
+        group spending, cash flow summary and daily discretionary spending)
+        are computed lazily and only once.
+        Transactions are kept sorted by date with a month offset table so
+        that months and date windows are sliced without scans or copies.
+        If a rollup cube is given (see mintkit.core.cube), the monthly sums
+        (cash flow summary and daily discretionary spending) and daily
+        lookbacks are computed from it instead of the transactions.
+        If running totals are given (see mintkit.core.running), the monthly
+        sums of their month are computed from them.
+
+        """
+        if transactions is None:
+            transactions = mintkit.core.analytics.get_transactions()
+        if recurring is None:
+            recurring = mintkit.core.analytics.get_recurring(template_path)
+        if investments is None:
+            investments = mintkit.core.analytics.get_investments(
+                template_path)
+        self.date_index = mintkit.core.dateindex.DateIndex(transactions)
+        self.transactions = self.date_index.transactions
+        self.cube_index = None
+        self.cube = None
+        if cube is not None:
+            self.cube_index = mintkit.core.dateindex.DateIndex(cube)
+            self.cube = self.cube_index.transactions
+        self.running = running
+        self.recurring = recurring
+        self.investments = investments
+        self.template_path = template_path
+        self._views = dict()
+        self._prefix_index = None
+
+    def _get_view(self, name, month, year, compute):
+        """Return the memoized view for the given month and year, computing
+        it on first use.
+
+        """
+        today = pd.Timestamp.today()
+        if month is None:
+            month = today.month
+        if year is None:
+            year = today.year
+        key = (name, month, year)
+        if key not in self._views:
+            log.debug(f'Computing {name} view for {month}/{year}.')
+            self._views[key] = compute(month, year)
+        return self._views[key]
+
+    def clear(self):
+        """Forget every memoized view.
+
+        """
+        self._views.clear()
+
+    def get_prefix_index(self):
+        """Return the prefix-sum index of the transactions (see
+        mintkit.core.prefix), building it on first use.
+
+        """
+        if self._prefix_index is None:
+            self._prefix_index = mintkit.core.prefix.PrefixSumIndex(
+                self.transactions)
+        return self._prefix_index
+
+    def get_window(self, start_date=None, end_date=None):
+        """Return the transactions dated on or after the start date and
+        before the end date (either may be None).
+
+        """
+        return self.date_index.get_window(start_date, end_date)
+
+    def get_month_transactions(self, month=None, year=None):
+        """Return the transactions dated in the given month.
+
+        """
+        return self._get_view('month', month, year,
+                              self.date_index.get_month)
+
+    def get_month_rollup(self, month=None, year=None):
+        """Return the rows the month's sums are computed from: the running
+        totals of that month, the month's rows of the rollup cube, or else
+        the month's transactions.
+
+        """
+        def compute(month, year):
+            if (self.running is not None and self.running.totals is not None
+                    and self.running.month == pd.Period(year=year,
+                                                        month=month,
+                                                        freq='M')):
+                return self.running.totals
+            if self.cube_index is not None:
+                return self.cube_index.get_month(month, year)
+            return self.get_month_transactions(month, year)
+        return self._get_view('rollup', month, year, compute)
+
+    def get_spending_by_group(self, month=None, year=None, append_net=True):
+        """Return a copy of the month's transaction totals by group and
+        subgroup (see mintkit.core.analytics.get_spending_by_group).
+
+        """
+        def compute(month, year):
+            return mintkit.core.analytics.get_spending_by_group(
+                self.get_month_transactions(month, year), month, year,
+                append_net=False)
+        group_spend = self._get_view('group', month, year, compute).copy()
+        if append_net:
+            group_spend.loc['Net', 'net'] = group_spend['net'].sum()
+        return group_spend
+
+    def get_cash_flow_summary(self, month=None, year=None):
+        """Return a copy of the month's cash flow summary (see
+        mintkit.core.analytics.get_cash_flow_summary).
+
+        """
+        def compute(month, year):
+            return mintkit.core.analytics.get_cash_flow_summary(
+                transactions=self.get_month_rollup(month, year),
+                recurring=self.recurring, investments=self.investments,
+                template_path=self.template_path, month=month, year=year)
+        return self._get_view('cash_flow', month, year, compute).copy()
+
+    def get_daily_discretionary(self, month=None, year=None):
+        """Return a DataFrame of the month's discretionary spending summed
+        by day (days without spending are omitted).
+
+        """
+        def compute(month, year):
+            month_df = self.get_month_rollup(month, year)
+            discr = month_df[month_df['Group'] == 'Discretionary']
+            return discr.groupby('Date')[['Amount']].sum()
+        return self._get_view('daily_discretionary', month, year, compute)
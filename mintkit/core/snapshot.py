@@ -0,0 +1,110 @@
+"""A memory-mapped snapshot of the refined and classified transactions
+returned by get_transactions.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import mintkit.core.merchants
+import pyarrow.feather
+import hashlib
+import pickle
+import os
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+# Snapshot file locations
+SNAPSHOT_PATH = cfg.paths.user + 'transactions.feather'
+SNAPSHOT_META_PATH = cfg.paths.user + 'transactions.meta'
+
+
+def get_file_signature(file_path):
+    """Return the size and modification time (ns) of a file.
+
+    """
+    stat = os.stat(str(file_path))
+    return stat.st_size, stat.st_mtime_ns
+
+
+def get_file_hash(file_path, chunk_size=1 << 20):
+    """Return the SHA-256 hash of a file's contents.
+
+    """
+    hasher = hashlib.sha256()
+    with open(str(file_path), 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def get_file_state(file_path):
+    """Return a dictionary describing a file's size, modification time and
+    hash.
+
+    """
+    return {'signature': get_file_signature(file_path),
+            'hash': get_file_hash(file_path)}
+
+
+def is_same_file(file_path, saved_state):
+    """Return whether a file's contents match a saved file state.
+    Files whose size and modification time are unchanged are assumed
+    identical; otherwise their hashes are compared.
+
+    """
+    signature = get_file_signature(file_path)
+    if signature == saved_state['signature']:
+        return True
+    if signature[0] != saved_state['signature'][0]:
+        return False
+    return get_file_hash(file_path) == saved_state['hash']
+
+
+def load_snapshot(file_path, template_path, options):
+    """Return the snapshot of the transactions if it was saved from the
+    same export, template, merchant table (see
+    mintkit.core.merchants.get_merchant_table_token) and get_transactions
+    options, otherwise None.
+    The snapshot is memory-mapped so numeric columns are read without
+    copies and pages are shared between concurrent processes.
+
+    """
+    if not (os.path.isfile(SNAPSHOT_META_PATH)
+            and os.path.isfile(SNAPSHOT_PATH)):
+        return None
+    merchant_token = mintkit.core.merchants.get_merchant_table_token()
+    try:
+        with open(SNAPSHOT_META_PATH, 'rb') as file:
+            meta = pickle.load(file)
+        is_valid = (meta['options'] == options
+                    and meta.get('merchants') == merchant_token
+                    and is_same_file(file_path, meta['source'])
+                    and is_same_file(template_path, meta['template']))
+    except Exception as e:
+        log.info(f'Transactions snapshot could not be validated: {e}')
+        return None
+    if not is_valid:
+        log.info('Transactions snapshot is out of date.')
+        return None
+    table = pyarrow.feather.read_table(str(SNAPSHOT_PATH), memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def save_snapshot(transactions, file_path, template_path, options):
+    """Save a snapshot of the transactions along with the state of the
+    export, template and merchant table it was built from.
+    The snapshot is written uncompressed so it can be memory-mapped.
+
+    """
+    meta = {'options': options,
+            'merchants': mintkit.core.merchants.get_merchant_table_token(),
+            'source': get_file_state(file_path),
+            'template': get_file_state(template_path)}
+    if os.path.isfile(SNAPSHOT_META_PATH):
+        os.remove(SNAPSHOT_META_PATH)
+    temp_path = str(SNAPSHOT_PATH) + '.tmp'
+    pyarrow.feather.write_feather(transactions, temp_path,
+                                  compression='uncompressed')
+    os.replace(temp_path, str(SNAPSHOT_PATH))
+    with open(SNAPSHOT_META_PATH, 'wb') as file:
+        pickle.dump(meta, file)
@@ -0,0 +1,241 @@
+"""An incremental on-disk store of refined and classified transactions,
+partitioned by month as Parquet files.
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import mintkit.core.analytics
+import mintkit.core.snapshot
+import mintkit.core.merchants
+import pandas as pd
+import numpy as np
+import pickle
+import os
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+# Name of the column holding each transaction's fingerprint
+FINGERPRINT = 'Fingerprint'
+# Metadata file holding the classification hash and merchant table token of
+# the stored rows and the state of the last merged export
+STORE_META_PATH = cfg.paths.store + 'store.meta'
+
+
+def get_row_fingerprints(transactions, columns):
+    """Return a uint64 fingerprint for every row from the values of the
+    given columns and the row's occurrence count among identical rows, so
+    that repeated identical transactions keep distinct fingerprints.
+
+    """
+    hashes = pd.util.hash_pandas_object(transactions[columns], index=False)
+    occurrence = hashes.groupby(hashes.values).cumcount()
+    keys = pd.DataFrame({'Hash': hashes.values,
+                         'Occurrence': occurrence.values})
+    fingerprints = pd.util.hash_pandas_object(keys, index=False)
+    return fingerprints.values
+
+
+def get_partition_path(month):
+    """Return the path of the partition holding the given month
+    ('YYYY-MM').
+
+    """
+    return cfg.paths.store + f'{month}.parquet'
+
+
+def get_partition_months():
+    """Return a sorted list of the months ('YYYY-MM') stored on disk.
+
+    """
+    months = [x[:-len('.parquet')] for x in os.listdir(cfg.paths.store)
+              if x.endswith('.parquet')]
+    months.sort()
+    return months
+
+
+def read_partition(month, columns=None):
+    """Return the stored transactions of the given month, with missing
+    text read back as NaN like in a freshly read export.
+
+    """
+    transactions = pd.read_parquet(str(get_partition_path(month)),
+                                   columns=columns)
+    return mintkit.core.analytics.restore_missing_text(transactions)
+
+
+def write_partition(month, transactions):
+    """Replace the stored transactions of the given month, deleting the
+    partition if there are none.
+
+    """
+    path = str(get_partition_path(month))
+    if len(transactions) == 0:
+        if os.path.isfile(path):
+            os.remove(path)
+        return
+    transactions = transactions.sort_values('Date', kind='mergesort')
+    transactions.to_parquet(path, index=False)
+
+
+def get_stored_fingerprints():
+    """Return a DataFrame of the fingerprint and month of every stored
+    transaction, reading only the fingerprint column of each partition.
+
+    """
+    frames = [read_partition(x, columns=[FINGERPRINT]).assign(Month=x)
+              for x in get_partition_months()]
+    if not frames:
+        return pd.DataFrame({FINGERPRINT: np.array([], dtype=np.uint64),
+                             'Month': np.array([], dtype=object)})
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_store_meta():
+    """Return a dictionary holding the classification hash and merchant
+    table token the stored rows were built with and the file state of the
+    last merged export, if any.
+
+    """
+    if not os.path.isfile(STORE_META_PATH):
+        return dict()
+    with open(STORE_META_PATH, 'rb') as file:
+        return pickle.load(file)
+
+
+def save_store_meta(meta):
+    """Save the store's classification hash, merchant table token and last
+    merged export state.
+
+    """
+    with open(STORE_META_PATH, 'wb') as file:
+        pickle.dump(meta, file)
+
+
+def reclassify_store(recurring, investments):
+    """Reclassify every stored transaction (e.g. after template changes).
+
+    """
+    log.info('Template rules changed, reclassifying the transaction store.')
+    state = mintkit.core.analytics.load_classification_state(recurring,
+                                                             investments)
+    for month in get_partition_months():
+        transactions = read_partition(month)
+        transactions[['Group', 'Subgroup']] = \
+            mintkit.core.analytics.classify_transactions_cached(
+                transactions, recurring, investments, state=state)
+        write_partition(month, transactions)
+    if state['changed']:
+        mintkit.core.analytics.save_classification_cache(state['hash'],
+                                                         state['cache'])
+
+
+def reintern_store():
+    """Reassign the merchant IDs of every stored transaction (e.g. after
+    the merchant table was replaced).
+
+    """
+    log.info('Merchant table changed, reassigning merchant IDs in the '
+             'transaction store.')
+    merchant_id = mintkit.core.merchants.MERCHANT_ID
+    for month in get_partition_months():
+        transactions = read_partition(month)
+        transactions[merchant_id] = mintkit.core.merchants.get_merchant_ids(
+            transactions['Description'])
+        write_partition(month, transactions)
+
+
+def refresh_store(recurring, investments):
+    """Bring the stored transactions up to date with the template rules
+    and the merchant table, reclassifying them or reassigning their
+    merchant IDs only if those changed since they were stored, and return
+    the store's metadata.
+
+    """
+    classification_hash = mintkit.core.analytics.get_classification_hash(
+        recurring, investments)
+    merchant_token = mintkit.core.merchants.get_merchant_table_token()
+    meta = load_store_meta()
+    if meta.get('classification') not in (None, classification_hash):
+        reclassify_store(recurring, investments)
+    if meta.get('merchants') not in (None, merchant_token):
+        reintern_store()
+    meta['classification'] = classification_hash
+    meta['merchants'] = merchant_token
+    save_store_meta(meta)
+    return meta
+
+
+def update_store(file_path=None):
+    """Merge a Mint export into the store and return the refined and
+    classified transactions that were not stored yet, or None if the
+    export is the one last merged.
+    Only rows whose fingerprint is unseen are refined, classified and
+    written, and only the month partitions they touch are rewritten.
+    As every export is a full history dump, stored rows missing from the
+    export within the months it covers (changed or deleted transactions)
+    are dropped.
+
+    """
+    if file_path is None:
+        file_path = mintkit.core.analytics.get_latest_file_location()
+    recurring = mintkit.core.analytics.get_recurring()
+    investments = mintkit.core.analytics.get_investments()
+    meta = refresh_store(recurring, investments)
+    if ('source' in meta
+            and mintkit.core.snapshot.is_same_file(file_path,
+                                                   meta['source'])):
+        log.info('Export was already merged into the transaction store.')
+        return None
+    raw = pd.read_csv(file_path,
+                      dtype=mintkit.core.analytics.TRANSACTION_DTYPES)
+    raw[FINGERPRINT] = get_row_fingerprints(raw, raw.columns.tolist())
+    months = pd.to_datetime(
+        raw['Date'], format=mintkit.core.analytics.DATE_FORMAT)
+    months = months.dt.strftime('%Y-%m')
+    stored = get_stored_fingerprints()
+    is_new = ~raw[FINGERPRINT].isin(stored[FINGERPRINT]).values
+    in_export_range = stored['Month'].between(months.min(), months.max())
+    is_stale = in_export_range & ~stored[FINGERPRINT].isin(raw[FINGERPRINT])
+    stale = set(stored.loc[is_stale, FINGERPRINT])
+    new = mintkit.core.analytics.refine_and_classify(
+        raw[is_new].copy(), recurring, investments)
+    new_months = months[is_new]
+    touched = set(new_months) | set(stored.loc[is_stale, 'Month'])
+    log.info(f'Storing {len(new)} new and dropping {len(stale)} stale '
+             f'transactions across {len(touched)} months.')
+    stored_months = set(get_partition_months())
+    for month in sorted(touched):
+        month_new = new[(new_months == month).values]
+        if month in stored_months:
+            month_df = read_partition(month)
+            month_df = month_df[~month_df[FINGERPRINT].isin(stale)]
+            month_df = pd.concat([month_df, month_new], ignore_index=True,
+                                 sort=False)
+        else:
+            month_df = month_new
+        write_partition(month, month_df)
+    meta['source'] = mintkit.core.snapshot.get_file_state(file_path)
+    save_store_meta(meta)
+    return new
+
+
+def load_store(start_month=None, end_month=None, columns=None):
+    """Return the stored transactions sorted by date, optionally limited
+    to the months ('YYYY-MM') between start_month and end_month inclusive.
+    The internal fingerprint column is only returned if it is requested
+    in columns.
+
+    """
+    months = get_partition_months()
+    if start_month is not None:
+        months = [x for x in months if x >= start_month]
+    if end_month is not None:
+        months = [x for x in months if x <= end_month]
+    frames = [read_partition(x, columns=columns) for x in months]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    transactions = pd.concat(frames, ignore_index=True, sort=False)
+    if columns is None:
+        transactions = transactions.drop(FINGERPRINT, axis=1)
+    return transactions
@@ -1,10 +1,16 @@
 import mintkit.config as cfg
 import mintkit.utils.logging
 import mintkit.core.analytics
+import mintkit.core.cube
+import mintkit.core.detect
 import mintkit.core.plotting
+import mintkit.core.running
+import mintkit.core.search
+import mintkit.core.session
 import mintkit.gmail.email
 import mintkit.web.driver
 from mintkit.auth.api import auth_api
+from mintkit.utils.formatting import usd
 import datetime
 import os
 import re
@@ -83,7 +89,8 @@ def download_transactions(driver=None, logged_in=False):
 
 
 def send_spending_update_text(download=True):
-    """Send the spending update text message.
+    """Send the spending update text message and return the analytics
+    session it was built from.
 
     """
     log.info('Preparing spending summary text')
@@ -91,15 +98,20 @@ def send_spending_update_text(download=True):
         log.info('Downloading transactions')
         download_transactions()
     log.info('Retrieving files')
-    transactions = mintkit.core.analytics.get_transactions()
+    transactions = mintkit.core.analytics.get_transactions(snapshot=True)
     investments = mintkit.core.analytics.get_investments()
     recurring = mintkit.core.analytics.get_recurring()
+    cube = mintkit.core.cube.update_cube(transactions)
+    running = mintkit.core.running.load_running_totals()
+    running.update(transactions)
+    running.save()
+    session = mintkit.core.session.AnalyticsSession(
+        transactions=transactions, recurring=recurring,
+        investments=investments, cube=cube, running=running)
     log.info('Getting summaries')
     summary = mintkit.core.analytics.get_recent_spending_summary(
-        transactions=transactions, recurring=recurring,
-        investments=investments, lookback=5)
-    mintkit.core.plotting.plot_spending(
-        transactions=transactions, recurring=recurring)
+        lookback=5, session=session)
+    mintkit.core.plotting.plot_spending(session=session, forecast=True)
     log.info('Constructing text message (email).')
     today = datetime.date.today()
     email = mintkit.gmail.email.EmailMessage()
@@ -109,32 +121,122 @@ def send_spending_update_text(download=True):
     email.add_image('spending', cfg.paths.plots + 'spending.png')
     email.send()
     log.info('Text update sent')
+    return session
 
 
-def send_auto_spending_text(download=False):
-    """Send the auto spending update text message.
+def send_watchlist_texts(download=False, names=None, session=None):
+    """Send a spending update text message for each category watchlist
+    (every watchlist in mintkit.core.analytics.WATCHLISTS by default),
+    aggregating all of them in a single pass over the current month.
+    If a session is given (e.g. the one returned by
+    send_spending_update_text), its transactions and monthly slice are
+    reused instead of loading the transactions again.
 
     """
-    log.info('Preparing auto spending summary text')
+    if names is None:
+        names = list(mintkit.core.analytics.WATCHLISTS)
+    log.info(f'Preparing watchlist spending texts: {", ".join(names)}')
     if download:
         log.info('Downloading transactions')
         download_transactions()
-    transactions = mintkit.core.analytics.get_transactions()
-    auto_stats = mintkit.core.analytics.get_current_auto_spending_stats(
-        transactions)
-    auto_stats = auto_stats.reset_index()
-    auto_smry = auto_stats.to_html(index=False, header=False)
+    if session is not None:
+        transactions = session.transactions
+    else:
+        transactions = mintkit.core.analytics.get_transactions(
+            snapshot=True)
+    watchlists = {x: mintkit.core.analytics.WATCHLISTS[x] for x in names}
+    watchlist_spend = mintkit.core.analytics.get_watchlist_spending(
+        transactions, watchlists=watchlists, session=session)
+    formatters = mintkit.core.analytics.get_amount_formatters(transactions)
     today = datetime.date.today()
-    email = mintkit.gmail.email.EmailMessage()
-    email.subject = f'Auto Spending {today:%a, %b %d}'
-    email.to = auth_api.user.mobile + '@vzwpix.com'
-    email.body = auto_smry
-    email.send()
+    for name in names:
+        stats = watchlist_spend[name].reset_index()
+        smry = stats.to_html(index=False, header=False,
+                             formatters=formatters)
+        email = mintkit.gmail.email.EmailMessage()
+        email.subject = f'{name} Spending {today:%a, %b %d}'
+        email.to = auth_api.user.mobile + '@vzwpix.com'
+        email.body = smry
+        email.send()
+
+
+def send_auto_spending_text(download=False, session=None):
+    """Send the auto spending update text message.
+
+    """
+    send_watchlist_texts(download=download, names=['Auto'],
+                         session=session)
+
+
+def report_rule_diagnostics(top=10):
+    """Log the matching time of every rule column, the slowest template
+    rules benchmarked on their own, the rules that never match and the
+    rules that are shadowed by an earlier rule.
+
+    """
+    log.info('Profiling template rules')
+    diagnostics = mintkit.core.analytics.get_rule_diagnostics()
+    matching = diagnostics.groupby(['Sheet', 'Column'], sort=False)[
+        'Column Seconds'].first()
+    log.info('Matching time per rule column (trie and alternation path):\n'
+             + matching.to_string())
+    columns = ['Sheet', 'Subgroup', 'Pattern', 'Path', 'Evaluations',
+               'Matches', 'Isolated Seconds']
+    slowest = diagnostics.sort_values('Isolated Seconds', ascending=False)
+    log.info(f'Slowest {top} rules (isolated per-rule benchmark):\n'
+             + slowest[columns].head(top).to_string())
+    never = diagnostics[diagnostics['Hits'] == 0]
+    log.info(f'Rules that never match ({len(never)}):\n'
+             + never[['Sheet', 'Subgroup', 'Column', 'Pattern']].to_string())
+    shadowed = diagnostics[diagnostics['Shadowed By'].notna()
+                           | ((diagnostics['Hits'] > 0)
+                              & (diagnostics['Matches'] == 0))]
+    log.info(f'Rules shadowed by an earlier rule ({len(shadowed)}):\n'
+             + shadowed[['Sheet', 'Subgroup', 'Pattern', 'Hits',
+                         'Shadowed By']].to_string())
+
+
+def report_recurring_candidates(top=20):
+    """Log the recurring transactions detected from their cadence that
+    are not yet classified by a Recurring rule.
+
+    """
+    log.info('Detecting recurring transactions')
+    transactions = mintkit.core.analytics.get_transactions(snapshot=True)
+    candidates = mintkit.core.detect.detect_recurring(transactions)
+    candidates = candidates[~candidates['Known'] & candidates['Active']]
+    candidates = candidates.drop(['Known', 'Active'], axis=1)
+    log.info(f'Recurring rule candidates ({len(candidates)}):\n'
+             + candidates.head(top).to_string())
+
+
+def search_transactions(query):
+    """Log the transactions matching a search query along with their total
+    amount by group and subgroup.
+
+    """
+    log.info(f'Searching transactions for "{query}"')
+    transactions = mintkit.core.analytics.get_transactions(snapshot=True)
+    matches = mintkit.core.search.search(transactions, query)
+    cents = mintkit.core.analytics.amounts_in_cents(transactions)
+    formatters = {'Amount': lambda x: usd(x, cents=cents)}
+    columns = ['Date', 'Description', 'Amount', 'Category', 'Group',
+               'Subgroup']
+    log.info(f'{len(matches)} transactions match "{query}":\n'
+             + matches[columns].to_string(index=False,
+                                          formatters=formatters))
+    totals = matches.groupby(['Group', 'Subgroup'], observed=True)
+    totals = totals['Amount'].agg(['size', 'sum'])
+    totals.columns = ['Count', 'Amount']
+    log.info('Totals by group:\n'
+             + totals.to_string(formatters=formatters))
+    log.info(f'Total: {usd(matches["Amount"].sum(), cents=cents)}')
+    return matches
 
 
 def send_texts():
     """Send all texts.
 
     """
-    send_spending_update_text(download=True)
-    send_auto_spending_text(download=False)
+    session = send_spending_update_text(download=True)
+    send_auto_spending_text(download=False, session=session)
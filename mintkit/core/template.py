@@ -0,0 +1,86 @@
+"""A cached loader for the sheets of the template Excel file
+(Cash Flow.xlsm).
+
+"""
+import mintkit.config as cfg
+import mintkit.utils.logging
+import mintkit.core.snapshot
+import pandas as pd
+import pickle
+import os
+
+
+log = mintkit.utils.logging.get_logger(cfg.PROJECT_NAME)
+
+# On-disk cache of the parsed template sheets
+TEMPLATE_CACHE_PATH = cfg.paths.user + 'template.cache'
+
+# In-process cache of the parsed template sheets by template path
+_template_cache = dict()
+
+
+def parse_template(template_path):
+    """Return a dictionary of the raw Cash Flow, Recurring and Investments
+    sheets, opening the workbook a single time with the reader pandas
+    picks for its format.
+
+    """
+    log.info('Parsing template workbook.')
+    with pd.ExcelFile(str(template_path)) as workbook:
+        sheets = {'Cash Flow': pd.read_excel(workbook,
+                                             sheet_name=0,
+                                             usecols='A:E',
+                                             header=5),
+                  'Recurring': pd.read_excel(workbook,
+                                             sheet_name='Recurring',
+                                             skiprows=2),
+                  'Investments': pd.read_excel(workbook,
+                                               sheet_name='Investments',
+                                               skiprows=2)}
+    return sheets
+
+
+def load_template_cache(template_path, signature):
+    """Return the template sheets cached on disk if they were parsed from
+    the same template path, size and modification time, otherwise None.
+
+    """
+    if not os.path.isfile(TEMPLATE_CACHE_PATH):
+        return None
+    try:
+        with open(TEMPLATE_CACHE_PATH, 'rb') as file:
+            key, sheets = pickle.load(file)
+    except Exception as e:
+        log.info(f'Template cache could not be loaded: {e}')
+        return None
+    if key != (str(template_path), signature):
+        return None
+    return sheets
+
+
+def save_template_cache(template_path, signature, sheets):
+    """Save the parsed template sheets to the user's directory.
+
+    """
+    with open(TEMPLATE_CACHE_PATH, 'wb') as file:
+        pickle.dump(((str(template_path), signature), sheets), file)
+
+
+def get_template_sheets(template_path=None):
+    """Return a dictionary of the raw template sheets, parsing the workbook
+    only when its size or modification time changed since it was last
+    parsed by this process or saved to the on-disk cache.
+
+    """
+    if template_path is None:
+        template_path = cfg.paths.template
+    signature = mintkit.core.snapshot.get_file_signature(template_path)
+    cached = _template_cache.get(str(template_path))
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    sheets = load_template_cache(template_path, signature)
+    if sheets is None:
+        sheets = parse_template(template_path)
+        save_template_cache(template_path, signature, sheets)
+    _template_cache[str(template_path)] = (signature, sheets)
+    return sheets
@@ -42,8 +42,20 @@ def setup_paths():
     mintkit.utils.paths.setup_template_path(cfg.paths)
 
 
+def search(query=None):
+    """Search the transactions, prompting for the query if not given.
+
+    """
+    if query is None:
+        query = click.prompt('Search transactions')
+    mintkit.core.tasks.search_transactions(query)
+
+
 _tasks = {'refresh': mintkit.core.tasks.refresh_accounts,
           'text': mintkit.core.tasks.send_texts,
+          'rules': mintkit.core.tasks.report_rule_diagnostics,
+          'recurring': mintkit.core.tasks.report_recurring_candidates,
+          'search': search,
           'setup': setup,
           'setup-paths': setup_paths,
           'setup-driver': mintkit.web.tasks.setup_chromedriver,
@@ -51,6 +63,8 @@ _tasks = {'refresh': mintkit.core.tasks.refresh_accounts,
           'setup-gmail': mintkit.gmail.tasks.setup_gmail_credentials,
           'logs': open_logs}
 
+_task_options = {'search': ['query']}
+
 
 @click.command()
 @click.option(
@@ -59,12 +73,23 @@ _tasks = {'refresh': mintkit.core.tasks.refresh_accounts,
     required=True,
     help="Name of task to execute."
 )
-def main_cli(task):
+@click.option(
+    "--query",
+    default=None,
+    help="Query of the search task (prompted for if not given)."
+)
+def main_cli(task, query):
     """Run the specified task.
 
     """
+    options = {'query': query}
+    options = {k: v for k, v in options.items() if v is not None}
+    unused = [k for k in options if k not in _task_options.get(task, [])]
+    if unused:
+        raise click.UsageError(f'--{unused[0]} is not used by the {task} '
+                               f'task.')
     try:
-        _tasks[task]()
+        _tasks[task](**options)
     except Exception as e:
         log.exception(e)
         raise
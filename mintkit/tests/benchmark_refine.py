@@ -0,0 +1,69 @@
+"""Benchmark the Date and Amount refinement of get_transactions on a
+synthetic Mint export.
+
+"""
+import mintkit.core.analytics
+import pandas as pd
+import numpy as np
+import time
+
+
+def get_synthetic_export(rows=1_000_000, seed=0):
+    """Return a DataFrame shaped like a raw Mint transactions export.
+
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2010-01-01', '2020-12-31')
+    dates = dates[rng.integers(0, len(dates), rows)]
+    transactions = pd.DataFrame({
+        'Date': dates.strftime('%m/%d/%Y'),
+        'Description': rng.choice(['Amazon', 'Netflix', 'Shell'], rows),
+        'Amount': np.round(rng.gamma(2, 30, rows), 2),
+        'Transaction Type': rng.choice(['debit', 'credit'], rows),
+        'Category': rng.choice(['Shopping', 'Television', 'Gas'], rows)})
+    return transactions
+
+
+def refine_transactions_rowwise(transactions):
+    """Refine the export with the original per-row Python loops.
+
+    """
+    transactions['Date'] = transactions['Date'].map(
+        lambda x: pd.Timestamp(x).date())
+    transactions['Amount'] = transactions.apply(
+        lambda x:
+        -x['Amount'] if x['Transaction Type'] == 'debit'
+        else x['Amount'], axis=1)
+    return transactions
+
+
+def time_refinement(refine, transactions):
+    """Return the seconds taken to refine a copy of the transactions and
+    the refined result.
+
+    """
+    transactions = transactions.copy()
+    start = time.perf_counter()
+    refined = refine(transactions)
+    return time.perf_counter() - start, refined
+
+
+def main(rows=1_000_000):
+    """Print the row-wise and vectorized refinement timings.
+
+    """
+    transactions = get_synthetic_export(rows)
+    rowwise_secs, expected = time_refinement(
+        refine_transactions_rowwise, transactions)
+    vector_secs, refined = time_refinement(
+        mintkit.core.analytics.refine_transactions, transactions)
+    expected['Date'] = pd.to_datetime(expected['Date'])
+    pd.testing.assert_frame_equal(expected, refined)
+    print(f'Rows: {rows:,}')
+    print(f'Row-wise: {rowwise_secs:.2f}s')
+    print(f'Vectorized: {vector_secs:.2f}s')
+    print(f'Speedup: {rowwise_secs / vector_secs:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
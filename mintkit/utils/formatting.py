@@ -1,9 +1,24 @@
+import numpy as np
 
 
-def usd(number, decimal_places=2):
+def to_cents(dollars):
+    """Return dollar amounts as an array of int64 cents.
+    Amounts are rounded to the nearest cent, which is exact for any figure
+    parsed from a value with at most two decimal places.
+
+    """
+    dollars = np.asarray(dollars, dtype=np.float64)
+    return np.round(dollars * 100).astype(np.int64)
+
+
+def usd(number, decimal_places=2, cents=False):
     """Return a properly formatted USD currency figure.
+    If cents is set to True, the number is given in cents and is converted
+    to dollars for display.
 
     """
+    if cents:
+        number = number / 100
     if number >= 0:
         return f'${number:,.{decimal_places}f}'
     else:
@@ -189,6 +189,9 @@ def create_key_paths(paths):
     # plots
     if not paths.plots.exists():
         paths.plots.create()
+    # store
+    if not paths.store.exists():
+        paths.store.create()
 
 
 def setup_template_path(paths):